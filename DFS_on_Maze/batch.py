@@ -0,0 +1,188 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+
+from maze import Maze
+from mazefile import pack_walls, unpack_walls
+from solver import get_solver
+
+#    ╔══════════════════════════════════════════════════════════════════════╗
+#    ║  Batch generation and solving over a process pool.                   ║
+#    ║                                                                      ║
+#    ║  Jobs are (cols, rows, generator, seed, solver, braid, max_cost)     ║
+#    ║  tuples; workers rebuild each maze from its seed, so only a few      ║
+#    ║  numbers cross the process boundary. Mazes built elsewhere are       ║
+#    ║  shipped as nibble-packed wall buffers (mazefile.pack_walls) plus    ║
+#    ║  their cell costs, if any, never as Cell objects.                    ║
+#    ║  Jobs are sent in chunks and per-maze stats stream back as each      ║
+#    ║  chunk finishes.                                                     ║
+#    ║                                                                      ║
+#    ║      python batch.py --count 10000 --size 50 --solver bfs            ║
+#    ╚══════════════════════════════════════════════════════════════════════╝
+
+# chunks in flight per worker, enough to keep every core busy between results
+CHUNKS_PER_WORKER = 4
+
+
+def _record(maze, solver, generated, solve):
+    start = time.perf_counter()
+    path, found, _, stats = solve(maze, maze.start, maze.goal)
+    return {
+        "cols": maze.cols,
+        "rows": maze.rows,
+        "generator": maze.generator,
+        "seed": maze.seed,
+        "solver": solver,
+        "generate_s": generated,
+        "solve_s": time.perf_counter() - start,
+        "nodes_visited": stats["nodes_visited"],
+        "dead_ends": stats["dead_ends"],
+        "path_length": len(path),
+        "path_cost": maze.path_cost(path),
+        "found": found,
+    }
+
+
+def generate_and_solve(jobs):
+    """Worker: build each (cols, rows, generator, seed, solver, braid, max_cost) maze
+    and solve it"""
+    records = []
+    for cols, rows, generator, seed, solver, braid, max_cost in jobs:
+        start = time.perf_counter()
+        maze = Maze(cols, rows, generator, seed, braid=braid, max_cost=max_cost)
+        records.append(_record(maze, solver, time.perf_counter() - start, get_solver(solver)))
+    return records
+
+
+def solve_packed(jobs):
+    """Worker: solve (packed walls, costs, cols, rows, generator, seed, solver) mazes,
+    costs being None for mazes where every step costs 1"""
+    records = []
+    for packed, costs, cols, rows, generator, seed, solver in jobs:
+        maze = Maze(cols, rows, generator, seed, walls=unpack_walls(packed, cols * rows), costs=costs)
+        records.append(_record(maze, solver, 0.0, get_solver(solver)))
+    return records
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def run_batch(jobs, workers=None, chunk_size=32, worker=generate_and_solve):
+    """Run jobs over a process pool, yielding one stats record per maze as chunks finish.
+
+    `jobs` may be a lazy iterable; at most CHUNKS_PER_WORKER chunks per worker
+    are queued at a time, so huge batches never sit in memory. Records come
+    back in completion order, not submission order. workers=1 runs inline.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = _chunks(jobs, chunk_size)
+    if workers == 1:
+        for chunk in chunks:
+            yield from worker(chunk)
+        return
+
+    with ProcessPoolExecutor(workers) as pool:
+        pending = {pool.submit(worker, chunk) for chunk in islice(chunks, workers * CHUNKS_PER_WORKER)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+                for chunk in islice(chunks, 1):
+                    pending.add(pool.submit(worker, chunk))
+
+
+def solve_mazes(mazes, solver="bfs", workers=None, chunk_size=32):
+    """Solve already generated mazes in parallel, shipping their walls packed and
+    their cell costs as they are"""
+    jobs = (
+        (pack_walls(maze.walls), maze.costs, maze.cols, maze.rows, maze.generator, maze.seed, solver)
+        for maze in mazes
+    )
+    return run_batch(jobs, workers, chunk_size, worker=solve_packed)
+
+
+class BatchStats:
+    """Running aggregate of batch records"""
+
+    FIELDS = ("generate_s", "solve_s", "nodes_visited", "dead_ends", "path_length", "path_cost")
+
+    def __init__(self):
+        self.count = 0
+        self.found = 0
+        self.totals = dict.fromkeys(self.FIELDS, 0)
+        self.minimum = {}
+        self.maximum = {}
+
+    def add(self, record):
+        self.count += 1
+        self.found += record["found"]
+        for field in self.FIELDS:
+            value = record[field]
+            self.totals[field] += value
+            self.minimum[field] = min(self.minimum.get(field, value), value)
+            self.maximum[field] = max(self.maximum.get(field, value), value)
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "found": self.found,
+            **{
+                field: {
+                    "mean": self.totals[field] / self.count if self.count else 0,
+                    "min": self.minimum.get(field, 0),
+                    "max": self.maximum.get(field, 0),
+                }
+                for field in self.FIELDS
+            },
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate and solve many mazes in parallel")
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--size", type=int, default=50, help="side length of every maze")
+    parser.add_argument("--generator", default="dfs")
+    parser.add_argument("--solver", default="bfs")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first maze; the rest count up")
+    parser.add_argument("--braid", type=float, default=0.0, metavar="FRACTION",
+                        help="fraction of dead ends opened into loops")
+    parser.add_argument("--max-cost", type=int, default=1, help="highest random cell cost (1: unweighted)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per core)")
+    parser.add_argument("--chunk-size", type=int, default=32, help="mazes per task sent to a worker")
+    parser.add_argument("--records", help="stream every per-maze record to this JSON-lines file")
+    args = parser.parse_args()
+
+    jobs = (
+        (args.size, args.size, args.generator, seed, args.solver, args.braid, args.max_cost)
+        for seed in range(args.seed, args.seed + args.count)
+    )
+    totals = BatchStats()
+    records = open(args.records, "w") if args.records else None
+    start = time.perf_counter()
+    try:
+        for record in run_batch(jobs, args.workers, args.chunk_size):
+            totals.add(record)
+            if records:
+                records.write(json.dumps(record) + "\n")
+            if totals.count % 1000 == 0:
+                print(f"{totals.count}/{args.count} mazes", file=sys.stderr)
+    finally:
+        if records:
+            records.close()
+    elapsed = time.perf_counter() - start
+
+    summary = totals.summary()
+    print(json.dumps(summary, indent=2))
+    print(f"{totals.count} mazes in {elapsed:.2f} s, {totals.count / elapsed:.1f} mazes/s "
+          f"on {args.workers or os.cpu_count()} worker(s)")
+
+
+if __name__ == "__main__":
+    main()
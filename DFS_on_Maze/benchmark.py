@@ -0,0 +1,776 @@
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from random import choice
+
+from maze import ALL_WALLS, BOTTOM, LEFT, RIGHT, TOP, Maze
+from solver import SOLVERS
+
+#    ╔══════════════════════════════════════════════════════════════════════╗
+#    ║  Headless micro-benchmarks, one subcommand each. render and viewport ║
+#    ║  need pygame and numpy; suite exits with status 1 on a regression.   ║
+#    ║                                                                      ║
+#    ║  memory      packed maze vs per-cell objects: build, peak memory     ║
+#    ║  solve       render-free solving time                                ║
+#    ║  paths       parent pointers vs copied path lists, one corridor      ║
+#    ║  solvers     every registered solver on the same maze                ║
+#    ║  neighbors   wall-mask delta table vs neighbor lists and Cells       ║
+#    ║  junctions   junction graph: build, compression, A* vs cells         ║
+#    ║  queries     LCA path index vs one BFS per query                     ║
+#    ║  agents      one multi-goal distance field vs one BFS per agent      ║
+#    ║  startup     cold import of every module, fonts and info box         ║
+#    ║  render      full vs incremental frames of both renderers            ║
+#    ║  viewport    camera frames at overview and zoomed scales             ║
+#    ║  generators  throughput of every maze generator                      ║
+#    ║  loops       every solver as braiding adds loops, with costs         ║
+#    ║  load        loading a saved maze vs generating it                   ║
+#    ║  batch       batch.py throughput against the worker count            ║
+#    ║  export      offline frame export vs the live animation              ║
+#    ║  suite       sizes x generators x solvers x seeds as JSON,           ║
+#    ║              compared with a saved baseline                          ║
+#    ║                                                                      ║
+#    ║      python benchmark.py memory --sizes 100 500 1000                 ║
+#    ║      python benchmark.py solve --sizes 1000                          ║
+#    ║      python benchmark.py paths --sizes 50 100 200                    ║
+#    ║      python benchmark.py solvers --sizes 500                         ║
+#    ║      python benchmark.py neighbors --sizes 100 500                   ║
+#    ║      python benchmark.py junctions --sizes 500 --seeds 0             ║
+#    ║      python benchmark.py queries --sizes 100 1000                    ║
+#    ║      python benchmark.py agents --sizes 200 1000                     ║
+#    ║      python benchmark.py startup                                     ║
+#    ║      python benchmark.py render --sizes 20 50 100                    ║
+#    ║      python benchmark.py viewport --sizes 1000 3000                  ║
+#    ║      python benchmark.py generators --sizes 500 --seeds 0 1 2        ║
+#    ║      python benchmark.py loops --sizes 200                           ║
+#    ║      python benchmark.py load --sizes 1000                           ║
+#    ║      python benchmark.py batch --sizes 50 --workers 1 2 4 8          ║
+#    ║      python benchmark.py export --sizes 100 500 --workers 1 4        ║
+#    ║      python benchmark.py suite --output baseline.json                ║
+#    ║      python benchmark.py suite --baseline baseline.json              ║
+#    ╚══════════════════════════════════════════════════════════════════════╝
+
+
+class LegacyCell:
+    """The original one-object-per-tile Cell, kept only as a baseline"""
+
+    def __init__(self, x, y, cols, rows):
+        self.x, self.y = x, y
+        self.cols, self.rows = cols, rows
+        self.walls = {"top": True, "right": True, "bottom": True, "left": True}
+        self.visited = False
+
+    def check_cell(self, x, y, grid_cells):
+        if x < 0 or x > self.cols - 1 or y < 0 or y > self.rows - 1:
+            return False
+        return grid_cells[x + y * self.cols]
+
+    def check_neighbors(self, grid_cells):
+        neighbors = []
+        for x, y in ((self.x, self.y - 1), (self.x + 1, self.y),
+                     (self.x, self.y + 1), (self.x - 1, self.y)):
+            cell = self.check_cell(x, y, grid_cells)
+            if cell and not cell.visited:
+                neighbors.append(cell)
+        return choice(neighbors) if neighbors else False
+
+    def get_neighbors(self, grid_cells):
+        neighbors = []
+        if not self.walls["top"]:
+            neighbors.append(self.check_cell(self.x, self.y - 1, grid_cells))
+        if not self.walls["right"]:
+            neighbors.append(self.check_cell(self.x + 1, self.y, grid_cells))
+        if not self.walls["bottom"]:
+            neighbors.append(self.check_cell(self.x, self.y + 1, grid_cells))
+        if not self.walls["left"]:
+            neighbors.append(self.check_cell(self.x - 1, self.y, grid_cells))
+        return [n for n in neighbors if n]
+
+
+def legacy_generate(cols, rows):
+    """Recursive-backtracker generation over LegacyCell objects"""
+    grid_cells = [LegacyCell(col, row, cols, rows)
+                  for row in range(rows)
+                  for col in range(cols)]
+    current_cell = grid_cells[0]
+    array = []
+    break_count = 1
+    while break_count != len(grid_cells):
+        current_cell.visited = True
+        next_cell = current_cell.check_neighbors(grid_cells)
+        if next_cell:
+            next_cell.visited = True
+            break_count += 1
+            array.append(current_cell)
+            dx, dy = current_cell.x - next_cell.x, current_cell.y - next_cell.y
+            if dx == 1:
+                current_cell.walls["left"], next_cell.walls["right"] = False, False
+            elif dx == -1:
+                current_cell.walls["right"], next_cell.walls["left"] = False, False
+            elif dy == 1:
+                current_cell.walls["top"], next_cell.walls["bottom"] = False, False
+            else:
+                current_cell.walls["bottom"], next_cell.walls["top"] = False, False
+            current_cell = next_cell
+        elif array:
+            current_cell = array.pop()
+    for cell in grid_cells:
+        cell.visited = False
+    return grid_cells
+
+
+def legacy_dfs(maze, start, goal):
+    """DFS that copies the whole path on every push, as solver.py used to"""
+    cols = maze.cols
+    goal_index = maze.index(*goal)
+    visited = bytearray(len(maze.walls))
+    explored = set()
+    stack = [(maze.index(*start), [])]
+    while stack:
+        current, current_path = stack.pop()
+        if visited[current]:
+            continue
+        visited[current] = 1
+        current_coords = (current % cols, current // cols)
+        explored.add(current_coords)
+        if current == goal_index:
+            return (current_path + [current_coords], True)
+        unvisited_neighbors = [n for n in maze.open_neighbors(current) if not visited[n]]
+        if not unvisited_neighbors:
+            return (current_path + [current_coords], False)
+        for neighbor in unvisited_neighbors:
+            stack.append((neighbor, current_path + [current_coords]))
+    return ([], False)
+
+
+def corridor_maze(cols, rows):
+    """A single serpentine corridor through every cell, the worst case for path copies"""
+    maze = Maze(cols, rows)
+    walls = bytearray([ALL_WALLS]) * (cols * rows)
+    for y in range(rows):
+        for x in range(cols - 1):
+            walls[x + y * cols] &= ~RIGHT
+            walls[x + 1 + y * cols] &= ~LEFT
+        if y < rows - 1:
+            x = cols - 1 if y % 2 == 0 else 0
+            walls[x + y * cols] &= ~BOTTOM
+            walls[x + (y + 1) * cols] &= ~TOP
+    maze.walls = walls
+    # serpentine rows end alternately on the right and left edge
+    maze.goal = (cols - 1 if rows % 2 else 0, rows - 1)
+    return maze
+
+
+def measure(func, *args):
+    """Return (seconds, peak_bytes) for one call of func(*args)"""
+    start = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    result = func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return elapsed, peak
+
+
+def bench_memory(sizes, legacy_limit):
+    print(f"{'size':>11} | {'model':<8} | {'build (s)':>10} | {'peak (MB)':>10} | {'bytes/cell':>10}")
+    print("-" * 62)
+    for size in sizes:
+        cells = size * size
+        rows = [("packed", measure(Maze, size, size))]
+        if size <= legacy_limit:
+            rows.append(("objects", measure(legacy_generate, size, size)))
+        for model, (elapsed, peak) in rows:
+            print(f"{size:>5}x{size:<5} | {model:<8} | {elapsed:>10.3f} | "
+                  f"{peak / 2**20:>10.1f} | {peak / cells:>10.1f}")
+
+
+def bench_solve(sizes):
+    print(f"{'size':>11} | {'generate (s)':>12} | {'solve (s)':>10} | {'visited':>9} | {'found':>5}")
+    print("-" * 60)
+    for size in sizes:
+        start = time.perf_counter()
+        maze = Maze(size, size)
+        generated = time.perf_counter() - start
+        start = time.perf_counter()
+        _, found = maze.solve()
+        solved = time.perf_counter() - start
+        print(f"{size:>5}x{size:<5} | {generated:>12.3f} | {solved:>10.3f} | "
+              f"{maze.stats['nodes_visited']:>9} | {str(found):>5}")
+
+
+def bench_paths(sizes, legacy_limit):
+    print(f"{'size':>11} | {'solver':<14} | {'solve (s)':>10} | {'peak (MB)':>10} | {'path':>8}")
+    print("-" * 66)
+    for size in sizes:
+        maze = corridor_maze(size, size)
+        solvers = [("parent array", lambda: SOLVERS["dfs"](maze, maze.start, maze.goal)[0])]
+        if size <= legacy_limit:
+            solvers.append(("path copies", lambda: legacy_dfs(maze, maze.start, maze.goal)[0]))
+        for name, solve in solvers:
+            elapsed, peak = measure(solve)
+            print(f"{size:>5}x{size:<5} | {name:<14} | {elapsed:>10.3f} | "
+                  f"{peak / 2**20:>10.1f} | {len(solve()):>8}")
+
+
+def bench_solvers(sizes):
+    print(f"{'size':>11} | {'solver':<17} | {'solve (s)':>10} | {'visited':>9} | {'path':>7} | {'found':>5}")
+    print("-" * 74)
+    for size in sizes:
+        maze = Maze(size, size)
+        for name, solve in SOLVERS.items():
+            start = time.perf_counter()
+            path, found, _, stats = solve(maze, maze.start, maze.goal)
+            elapsed = time.perf_counter() - start
+            print(f"{size:>5}x{size:<5} | {name:<17} | {elapsed:>10.3f} | "
+                  f"{stats['nodes_visited']:>9} | {len(path):>7} | {str(found):>5}")
+
+
+def bench_neighbors(sizes, legacy_limit):
+    print(f"{'size':>11} | {'method':<22} | {'expand all (s)':>14} | {'expansions/s':>14} | {'neighbors':>9}")
+    print("-" * 84)
+    for size in sizes:
+        cells = size * size
+        maze = Maze(size, size, seed=0)
+
+        def delta_table():
+            walls, deltas = maze.walls, maze.deltas
+            found = 0
+            for i in range(cells):
+                for delta in deltas[walls[i]]:
+                    found += 1
+            return found
+
+        methods = [
+            ("delta table", delta_table),
+            ("open_neighbors list", lambda: sum(len(maze.open_neighbors(i)) for i in range(cells))),
+            ("Cell.get_neighbors", lambda: sum(len(c.get_neighbors(maze.grid_cells)) for c in maze.grid_cells)),
+        ]
+        if size <= legacy_limit:
+            legacy = legacy_generate(size, size)
+            methods.append(("legacy Cell objects", lambda: sum(len(c.get_neighbors(legacy)) for c in legacy)))
+        for name, expand in methods:
+            start = time.perf_counter()
+            found = expand()
+            elapsed = time.perf_counter() - start
+            print(f"{size:>5}x{size:<5} | {name:<22} | {elapsed:>14.3f} | {cells / elapsed:>14,.0f} | {found:>9}")
+
+
+def bench_junctions(sizes, seeds):
+    from generators import GENERATORS
+
+    print(f"{'size':>11} | {'generator':<12} | {'build (s)':>9} | {'nodes':>8} | {'edges':>8} | {'ratio':>6} | "
+          f"{'astar (s)':>9} | {'visited':>8} | {'junction (s)':>12} | {'visited':>8}")
+    print("-" * 116)
+    for size in sizes:
+        for name in GENERATORS:
+            for seed in seeds:
+                maze = Maze(size, size, name, seed)
+                start = time.perf_counter()
+                graph = maze.junction_graph()
+                built = time.perf_counter() - start
+
+                start = time.perf_counter()
+                _, _, _, cell_stats = SOLVERS["astar"](maze, maze.start, maze.goal)
+                cell_time = time.perf_counter() - start
+                start = time.perf_counter()
+                _, _, _, graph_stats = SOLVERS["junction_astar"](maze, maze.start, maze.goal)
+                graph_time = time.perf_counter() - start
+                print(f"{size:>5}x{size:<5} | {name:<12} | {built:>9.3f} | {graph.node_count:>8} | "
+                      f"{graph.edge_count:>8} | {graph.compression:>5.1f}x | {cell_time:>9.3f} | "
+                      f"{cell_stats['nodes_visited']:>8} | {graph_time:>12.3f} | {graph_stats['nodes_visited']:>8}")
+
+
+def bench_queries(sizes, queries=2000, searched=20):
+    from random import Random
+
+    print(f"{'size':>11} | {'build (s)':>9} | {'levels':>6} | {'distances/s':>12} | {'mean path':>9} | "
+          f"{'paths/s':>10} | {'bfs paths/s':>11} | {'speedup':>8}")
+    print("-" * 100)
+    for size in sizes:
+        maze = Maze(size, size, seed=0)
+        rng = Random(0)
+        pairs = [
+            ((rng.randrange(size), rng.randrange(size)), (rng.randrange(size), rng.randrange(size)))
+            for _ in range(queries)
+        ]
+        start = time.perf_counter()
+        index = maze.path_index()
+        built = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index.distances(pairs)
+        distance_rate = queries / (time.perf_counter() - start)
+        # paths are dropped as they come, a batch of long paths would not fit in memory
+        start = time.perf_counter()
+        cells = sum(len(index.path(a, b)) for a, b in pairs)
+        path_rate = queries / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for a, b in pairs[:searched]:
+            SOLVERS["bfs"](maze, a, b)
+        search_rate = searched / (time.perf_counter() - start)
+        print(f"{size:>5}x{size:<5} | {built:>9.3f} | {len(index.up):>6} | {distance_rate:>12,.0f} | "
+              f"{cells // queries:>9} | {path_rate:>10,.0f} | {search_rate:>11,.1f} | {path_rate / search_rate:>7,.0f}x")
+
+
+def bench_agents(sizes, agent_counts=(10, 100, 1000), goal_counts=(1, 16), searched=20):
+    from random import Random
+
+    from distance_field import DistanceField
+
+    print(f"{'size':>11} | {'agents':>6} | {'goals':>5} | {'field (s)':>9} | {'paths (s)':>9} | "
+          f"{'walk (s)':>8} | {'mean path':>9} | {'bfs each (s)':>12} | {'speedup':>8}")
+    print("-" * 104)
+    for size in sizes:
+        maze = Maze(size, size, seed=0)
+        rng = Random(0)
+        for goal_count in goal_counts:
+            goals = [maze.goal] + [(rng.randrange(size), rng.randrange(size)) for _ in range(goal_count - 1)]
+            for agent_count in agent_counts:
+                agents = [(rng.randrange(size), rng.randrange(size)) for _ in range(agent_count)]
+                start = time.perf_counter()
+                field = DistanceField(maze, goals)
+                built = time.perf_counter() - start
+
+                start = time.perf_counter()
+                cells = sum(len(field.path(agent)) for agent in agents)
+                followed = time.perf_counter() - start
+                # every agent advancing one step per tick until the last one arrives
+                positions = field.indices(agents)
+                start = time.perf_counter()
+                for _ in range(int(field.distances(agents).max())):
+                    positions = field.step(positions)
+                walked = time.perf_counter() - start
+
+                # one BFS per agent to the goal its field path ends at (a solver given
+                # several goals would have to try each), timed on a sample
+                sample = agents[:searched]
+                start = time.perf_counter()
+                for agent, goal in zip(sample, field.nearest_goals(sample)):
+                    SOLVERS["bfs"](maze, agent, goal)
+                searches = (time.perf_counter() - start) / len(sample) * agent_count
+                print(f"{size:>5}x{size:<5} | {agent_count:>6} | {goal_count:>5} | {built:>9.3f} | "
+                      f"{followed:>9.3f} | {walked:>8.3f} | {cells // agent_count:>9} | {searches:>12.3f} | "
+                      f"{searches / (built + followed):>7,.1f}x")
+
+
+def bench_startup(repeat=5):
+    import os
+    import subprocess
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+    print(f"{'module':<12} | {'cold import (ms)':>16} | {'loads pygame':>12}")
+    print("-" * 48)
+    for module in ("maze", "solver", "generators", "mazefile", "batch", "config", "draw", "ui"):
+        code = (
+            "import sys, time; start = time.perf_counter(); import {0}; "
+            "print(time.perf_counter() - start, 'pygame' in sys.modules)"
+        ).format(module)
+        times = []
+        for _ in range(repeat):
+            output = subprocess.run(
+                [sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                env={**os.environ, "PYGAME_HIDE_SUPPORT_PROMPT": "1"},
+            ).stdout.split()
+            times.append(float(output[0]))
+        print(f"{module:<12} | {min(times) * 1000:>16.1f} | {output[1]:>12}")
+
+    import pygame
+    from draw import Drawing
+    from fonts import get_font
+
+    pygame.display.init()
+    drawer = Drawing(pygame.Surface((400, 300)))
+    start = time.perf_counter()
+    pygame.font.init()
+    pygame.font.SysFont("Arial", 24)
+    uncached = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(1000):
+        get_font(24)
+    cached = (time.perf_counter() - start) / 1000
+    start = time.perf_counter()
+    for _ in range(1000):
+        drawer.draw_info_text("Press Return to Solve the Maze")
+    info = (time.perf_counter() - start) / 1000
+    print(f"\nSysFont: {uncached * 1000:.2f} ms, cached get_font: {cached * 1e6:.2f} us, "
+          f"draw_info_text: {info * 1000:.3f} ms per frame")
+
+
+def bench_render(sizes, frames=200):
+    import os
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    from draw import Drawing
+    from draw_array import ArrayDrawing
+    from ui import fit_tile_size
+
+    pygame.display.init()
+    print(f"{'size':>11} | {'tile':>4} | {'renderer':<8} | {'static (ms)':>11} | {'full frame (ms)':>15} | "
+          f"{'solver step (ms)':>16} | {'idle frame (ms)':>15}")
+    print("-" * 100)
+    for size in sizes:
+        maze = Maze(size, size)
+        tile = fit_tile_size(size, size)
+        for name, renderer in (("pygame", Drawing), ("numpy", ArrayDrawing)):
+            drawer = renderer(pygame.Surface((size * tile, size * tile)), tile)
+            # full frames are measured with half of the maze explored
+            explored = {(x, y) for y in range(size // 2) for x in range(size)}
+
+            start = time.perf_counter()
+            drawer.static_layers(maze.grid_cells, size, size)
+            static = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for _ in range(3):
+                drawer.invalidate()
+                drawer.draw_maze(maze.grid_cells, size, size, explored)
+            full = (time.perf_counter() - start) / 3
+
+            cells = [(i % size, size // 2 + (i // size) % (size - size // 2)) for i in range(frames)]
+            start = time.perf_counter()
+            for cell in cells:
+                explored.add(cell)
+                drawer.draw_maze(maze.grid_cells, size, size, explored, changed=[cell])
+            step = (time.perf_counter() - start) / frames
+
+            start = time.perf_counter()
+            for _ in range(frames):
+                drawer.draw_maze(maze.grid_cells, size, size, explored)
+            idle = (time.perf_counter() - start) / frames
+            print(f"{size:>5}x{size:<5} | {tile:>4} | {name:<8} | {static * 1000:>11.2f} | {full * 1000:>15.2f} | "
+                  f"{step * 1000:>16.3f} | {idle * 1000:>15.4f}")
+
+
+def bench_viewport(sizes, steps_per_frame=20000, frames=30):
+    import os
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    from camera import Camera
+    from config import DEFAULT_HEIGHT, DEFAULT_WIDTH
+    from draw_array import CameraDrawing
+
+    pygame.display.init()
+    print(f"{'size':>11} | {'zoom':<10} | {'full frame (ms)':>15} | {'solver step (ms)':>16} | {'pan frame (ms)':>14}")
+    print("-" * 80)
+    for size in sizes:
+        maze = Maze(size, size)
+        for zoom in (0, 3, 6):
+            camera = Camera(size, size, DEFAULT_WIDTH, DEFAULT_HEIGHT)
+            for _ in range(zoom):
+                camera.zoom(1)
+            drawer = CameraDrawing(pygame.Surface((DEFAULT_WIDTH, DEFAULT_HEIGHT)), camera)
+            maze.reset()
+            search = maze.search("bfs")
+            explored = maze.explored_cells
+
+            start = time.perf_counter()
+            drawer.draw_maze(maze.grid_cells, size, size, explored)
+            full = time.perf_counter() - start
+
+            # only the drawing is timed, not the search producing the cells
+            step = 0
+            for _ in range(frames):
+                changed = search.step(steps_per_frame)
+                start = time.perf_counter()
+                drawer.draw_maze(maze.grid_cells, size, size, explored, changed=changed)
+                step += (time.perf_counter() - start) / frames
+
+            start = time.perf_counter()
+            for frame in range(frames):
+                camera.pan(16 if frame % 2 else -16, 16)
+                drawer.draw_maze(maze.grid_cells, size, size, explored)
+            pan = (time.perf_counter() - start) / frames
+            scale = f"1:{camera.step}" if camera.step > 1 else f"{camera.tile} px"
+            print(f"{size:>5}x{size:<5} | {scale:<10} | {full * 1000:>15.2f} | {step * 1000:>16.2f} | {pan * 1000:>14.2f}")
+
+
+def bench_generators(sizes, seeds):
+    from generators import GENERATORS
+
+    print(f"{'size':>11} | {'generator':<12} | {'generate (s)':>12} | {'cells/s':>12} | {'dead ends':>9}")
+    print("-" * 70)
+    for size in sizes:
+        cells = size * size
+        for name in GENERATORS:
+            elapsed = dead_ends = 0
+            for seed in seeds:
+                start = time.perf_counter()
+                maze = Maze(size, size, name, seed)
+                elapsed += time.perf_counter() - start
+                dead_ends += sum(1 for i in range(cells) if len(maze.open_neighbors(i)) == 1)
+            elapsed /= len(seeds)
+            print(f"{size:>5}x{size:<5} | {name:<12} | {elapsed:>12.3f} | "
+                  f"{cells / elapsed:>12,.0f} | {dead_ends // len(seeds):>9}")
+
+
+def bench_loops(sizes, braids=(0.0, 0.1, 0.25, 0.5, 1.0), max_costs=(1, 9)):
+    print(f"{'size':>11} | {'braid':>5} | {'cost':>4} | {'loops':>7} | {'solver':<17} | {'solve (s)':>10} | "
+          f"{'visited':>9} | {'steps':>7} | {'path cost':>9} | {'optimal':>7}")
+    print("-" * 111)
+    for size in sizes:
+        for max_cost in max_costs:
+            for braid in braids:
+                maze = Maze(size, size, "dfs", 0, braid=braid, max_cost=max_cost)
+                loops = maze.loop_count()
+                results = []
+                for name, solve in SOLVERS.items():
+                    start = time.perf_counter()
+                    path, found, _, stats = solve(maze, maze.start, maze.goal)
+                    elapsed = time.perf_counter() - start
+                    results.append((name, elapsed, stats["nodes_visited"], path, found))
+                # dijkstra's answer is the cheapest path; dfs stops at its first dead end
+                best = next(maze.path_cost(path) for name, _, _, path, _ in results if name == "dijkstra")
+                for name, elapsed, visited, path, found in results:
+                    cost = maze.path_cost(path) if found else None
+                    print(f"{size:>5}x{size:<5} | {braid:>5.2f} | {max_cost:>4} | {loops:>7} | {name:<17} | "
+                          f"{elapsed:>10.3f} | {visited:>9} | {len(path) - 1:>7} | "
+                          f"{cost if found else '-':>9} | {'yes' if cost == best else 'no':>7}")
+
+
+def bench_load(sizes):
+    import os
+    import tempfile
+
+    print(f"{'size':>11} | {'generate (s)':>12} | {'save (s)':>9} | {'load (s)':>9} | {'file (KB)':>10} | {'speedup':>8}")
+    print("-" * 76)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.maze")
+        for size in sizes:
+            start = time.perf_counter()
+            maze = Maze(size, size, seed=0)
+            generated = time.perf_counter() - start
+            maze.solve(solver="bfs")
+
+            start = time.perf_counter()
+            maze.save(path)
+            saved = time.perf_counter() - start
+
+            start = time.perf_counter()
+            loaded = Maze.load(path)
+            load_time = time.perf_counter() - start
+            assert loaded.walls == maze.walls
+
+            print(f"{size:>5}x{size:<5} | {generated:>12.3f} | {saved:>9.3f} | {load_time:>9.4f} | "
+                  f"{os.path.getsize(path) / 1024:>10.0f} | {generated / load_time:>7.0f}x")
+
+
+def bench_batch(sizes, workers, count=400):
+    import os
+    from batch import run_batch
+
+    workers = workers or sorted({1, 2, 4, os.cpu_count() or 1})
+    print(f"{'size':>11} | {'workers':>7} | {'mazes':>6} | {'time (s)':>9} | {'mazes/s':>9} | {'scaling':>7}")
+    print("-" * 66)
+    for size in sizes:
+        serial = None
+        for count_workers in workers:
+            jobs = [(size, size, "dfs", seed, "bfs", 0.0, 1) for seed in range(count)]
+            start = time.perf_counter()
+            solved = sum(1 for _ in run_batch(jobs, count_workers))
+            elapsed = time.perf_counter() - start
+            serial = serial or elapsed * count_workers
+            print(f"{size:>5}x{size:<5} | {count_workers:>7} | {solved:>6} | {elapsed:>9.3f} | "
+                  f"{solved / elapsed:>9.1f} | {serial / elapsed:>6.2f}x")
+
+
+def bench_export(sizes, workers, frames=100):
+    import os
+    import shutil
+    import tempfile
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    from config import SOLVING_SPEED
+    from export import record_events, render_log, save_events
+
+    workers = workers or sorted({1, 2, 4, os.cpu_count() or 1})
+    print(f"{'size':>11} | {'steps':>8} | {'live (s)':>9} | {'record (s)':>10} | {'format':>6} | "
+          f"{'workers':>7} | {'render (s)':>10} | {'frames/s':>8}")
+    print("-" * 92)
+    directory = tempfile.mkdtemp()
+    try:
+        for size in sizes:
+            maze = Maze(size, size, "eller", 0)
+            start = time.perf_counter()
+            explored, path, found = record_events(maze, "bfs")
+            record = time.perf_counter() - start
+            log = os.path.join(directory, "run.maze")
+            save_events(log, maze, explored, (path, found))
+            # what the animation takes at the default delay between steps
+            live = len(explored) * SOLVING_SPEED / 1000
+            for output in ("frames", "run.gif"):
+                for count_workers in workers:
+                    target = os.path.join(directory, output)
+                    start = time.perf_counter()
+                    written = render_log(log, target, frames, workers=count_workers)
+                    elapsed = time.perf_counter() - start
+                    print(f"{size:>5}x{size:<5} | {len(explored):>8} | {live:>9.0f} | {record:>10.3f} | "
+                          f"{'gif' if output.endswith('.gif') else 'png':>6} | {count_workers:>7} | "
+                          f"{elapsed:>10.3f} | {written / elapsed:>8.1f}")
+                    shutil.rmtree(target, ignore_errors=True)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def run_case(size, generator, solver, seed, repeat):
+    """Generate and solve one maze; returns the suite's result record"""
+    start = time.perf_counter()
+    maze = Maze(size, size, generator, seed)
+    generated = time.perf_counter() - start
+
+    solve = SOLVERS[solver]
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        path, found, _, stats = solve(maze, maze.start, maze.goal)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    # memory is traced in a separate run so tracing does not inflate the times
+    tracemalloc.start()
+    solve(maze, maze.start, maze.goal)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "size": size,
+        "generator": generator,
+        "solver": solver,
+        "seed": seed,
+        "generate_s": generated,
+        "solve_s": best,
+        "peak_bytes": peak,
+        "nodes_visited": stats["nodes_visited"],
+        "dead_ends": stats["dead_ends"],
+        "path_length": stats["path_length"],
+        "found": found,
+    }
+
+
+# differences below these are timer or allocator noise, whatever the threshold says
+NOISE_FLOOR = {"solve_s": 0.002, "peak_bytes": 64 * 1024}
+
+
+def case_key(result):
+    return (result["size"], result["generator"], result["solver"], result["seed"])
+
+
+def compare(results, baseline, threshold):
+    """Return one message per case that got slower or hungrier than `threshold` allows"""
+    previous = {case_key(result): result for result in baseline["results"]}
+    regressions = []
+    for result in results:
+        old = previous.get(case_key(result))
+        if old is None:
+            continue
+        name = "{}x{} {} {} seed {}".format(result["size"], result["size"], *case_key(result)[1:])
+        for metric in ("solve_s", "peak_bytes"):
+            if (
+                result[metric] > old[metric] * (1 + threshold)
+                and result[metric] - old[metric] > NOISE_FLOOR[metric]
+            ):
+                regressions.append(
+                    f"{name}: {metric} {old[metric]:.4g} -> {result[metric]:.4g} "
+                    f"(+{(result[metric] / old[metric] - 1) * 100:.0f}%)"
+                )
+        # the counters are deterministic per seed, so any difference is a behaviour change
+        for metric in ("nodes_visited", "path_length", "found"):
+            if result[metric] != old[metric]:
+                regressions.append(f"{name}: {metric} changed {old[metric]} -> {result[metric]}")
+    return regressions
+
+
+def bench_suite(sizes, generators, solvers, seeds, repeat, output, baseline, threshold):
+    from generators import GENERATORS
+
+    generators = generators or list(GENERATORS)
+    solvers = solvers or list(SOLVERS)
+    print(f"{'size':>11} | {'generator':<12} | {'solver':<17} | {'seed':>4} | {'solve (s)':>10} | "
+          f"{'peak (MB)':>9} | {'visited':>9} | {'dead ends':>9} | {'path':>7}")
+    print("-" * 110)
+    results = []
+    for size in sizes:
+        for generator in generators:
+            for solver in solvers:
+                for seed in seeds:
+                    result = run_case(size, generator, solver, seed, repeat)
+                    results.append(result)
+                    print(f"{size:>5}x{size:<5} | {generator:<12} | {solver:<17} | {seed:>4} | "
+                          f"{result['solve_s']:>10.4f} | {result['peak_bytes'] / 2**20:>9.2f} | "
+                          f"{result['nodes_visited']:>9} | {result['dead_ends']:>9} | {result['path_length']:>7}")
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "repeat": repeat,
+        "results": results,
+    }
+    if output:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nwrote {len(results)} results to {output}")
+
+    if baseline:
+        with open(baseline) as f:
+            regressions = compare(results, json.load(f), threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) against {baseline} (threshold {threshold:.0%}):")
+            for message in regressions:
+                print(f"  {message}")
+            sys.exit(1)
+        print(f"\nno regressions against {baseline} (threshold {threshold:.0%})")
+
+
+BENCHMARKS = {
+    "memory": lambda args: bench_memory(args.sizes, args.legacy_limit),
+    "solve": lambda args: bench_solve(args.sizes),
+    "paths": lambda args: bench_paths(args.sizes, args.legacy_limit),
+    "solvers": lambda args: bench_solvers(args.sizes),
+    "neighbors": lambda args: bench_neighbors(args.sizes, args.legacy_limit),
+    "junctions": lambda args: bench_junctions(args.sizes, args.seeds),
+    "queries": lambda args: bench_queries(args.sizes),
+    "agents": lambda args: bench_agents(args.sizes),
+    "startup": lambda args: bench_startup(),
+    "render": lambda args: bench_render(args.sizes),
+    "viewport": lambda args: bench_viewport(args.sizes),
+    "generators": lambda args: bench_generators(args.sizes, args.seeds),
+    "loops": lambda args: bench_loops(args.sizes),
+    "load": lambda args: bench_load(args.sizes),
+    "batch": lambda args: bench_batch(args.sizes, args.workers),
+    "export": lambda args: bench_export(args.sizes, args.workers),
+    "suite": lambda args: bench_suite(
+        args.sizes, args.generators, args.solvers, args.seeds, args.repeat,
+        args.output, args.baseline, args.threshold,
+    ),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless maze benchmarks")
+    parser.add_argument("benchmark", choices=sorted(BENCHMARKS))
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 250, 500])
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0, 1, 2])
+    parser.add_argument("--legacy-limit", type=int, default=500,
+                        help="largest side length to run the slow baseline on")
+    parser.add_argument("--workers", type=int, nargs="+",
+                        help="worker counts for the batch benchmark (default: 1, 2, 4 and all cores)")
+    suite = parser.add_argument_group("suite")
+    suite.add_argument("--generators", nargs="+", help="generators to sweep (default: all)")
+    suite.add_argument("--solvers", nargs="+", help="solvers to sweep (default: all)")
+    suite.add_argument("--repeat", type=int, default=3, help="solve runs per case, the best is kept")
+    suite.add_argument("--output", help="write the results as JSON")
+    suite.add_argument("--baseline", help="JSON results to compare against")
+    suite.add_argument("--threshold", type=float, default=0.25,
+                       help="allowed slowdown or memory growth before a case is a regression")
+    args = parser.parse_args()
+    BENCHMARKS[args.benchmark](args)
+
+
+if __name__ == "__main__":
+    main()
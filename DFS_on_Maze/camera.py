@@ -0,0 +1,91 @@
+from config import MAX_ZOOM_TILE
+
+#    ╔══════════════════════════════════════════════════════════════════════╗
+#    ║  Zoom and pan over a maze that may be far larger than the window.    ║
+#    ║                                                                      ║
+#    ║  Zoomed in, every cell is `tile` pixels wide. Zoomed out past one    ║
+#    ║  pixel per cell, every pixel stands for a `step` x `step` block of   ║
+#    ║  cells (the downsampled overview). (x, y) is the cell at the top     ║
+#    ║  left of the window, so the visible cells are a plain index range    ║
+#    ║  and renderers never look at anything outside it. `version` goes     ║
+#    ║  up on every change so renderers know when to repaint.               ║
+#    ╚══════════════════════════════════════════════════════════════════════╝
+
+
+class Camera:
+    def __init__(self, cols, rows, width, height):
+        self.cols, self.rows = cols, rows
+        self.width, self.height = width, height
+        self.version = 0
+        self.fit()
+
+    def fit(self):
+        """Zoom so the whole maze fits the window, anchored at the top left"""
+        if self.cols <= self.width and self.rows <= self.height:
+            self.tile = max(1, min(MAX_ZOOM_TILE, self.width // self.cols, self.height // self.rows))
+            self.step = 1
+        else:
+            self.tile = 1
+            self.step = self.max_step
+        self.x = self.y = 0
+        self.version += 1
+
+    @property
+    def max_step(self):
+        """Coarsest overview: the whole maze in one window"""
+        return max(1, -(-self.cols // self.width), -(-self.rows // self.height))
+
+    @property
+    def span(self):
+        """Number of (columns, rows) of cells the window covers"""
+        return (
+            -(-self.width * self.step // self.tile),
+            -(-self.height * self.step // self.tile),
+        )
+
+    def visible(self):
+        """Visible cells as (x0, y0, x1, y1), x1 and y1 exclusive"""
+        span_x, span_y = self.span
+        return (self.x, self.y, min(self.cols, self.x + span_x), min(self.rows, self.y + span_y))
+
+    def to_cell(self, px, py):
+        """Cell under window pixel (px, py)"""
+        return (self.x + px * self.step // self.tile, self.y + py * self.step // self.tile)
+
+    def move_to(self, x, y):
+        """Put cell (x, y) at the top left, clamped so the maze stays on screen"""
+        x, y = self._clamp(x, y)
+        if (x, y) != (self.x, self.y):
+            self.x, self.y = x, y
+            self.version += 1
+
+    def _clamp(self, x, y):
+        span_x, span_y = self.span
+        x = max(0, min(int(x), self.cols - span_x))
+        y = max(0, min(int(y), self.rows - span_y))
+        # overview blocks stay aligned so panning does not make them shimmer
+        return x - x % self.step, y - y % self.step
+
+    def pan(self, dx, dy):
+        """Scroll by (dx, dy) window pixels"""
+        self.move_to(self.x + dx * self.step / self.tile, self.y + dy * self.step / self.tile)
+
+    def zoom(self, direction, pixel=None):
+        """Zoom in (direction > 0) or out one level, keeping the cell under `pixel` in place"""
+        px, py = pixel if pixel is not None else (self.width // 2, self.height // 2)
+        cell_x, cell_y = self.to_cell(px, py)
+        tile, step = self.tile, self.step
+        if direction > 0:
+            if step > 1:
+                step //= 2
+            else:
+                tile = min(MAX_ZOOM_TILE, tile * 2)
+        elif tile > 1:
+            tile //= 2
+        else:
+            step = min(self.max_step, step * 2)
+        if (tile, step) == (self.tile, self.step):
+            return
+        self.tile, self.step = tile, step
+        self.x, self.y = self._clamp(cell_x - px * step // tile, cell_y - py * step // tile)
+        self.version += 1
@@ -0,0 +1,196 @@
+import argparse
+import asyncio
+import base64
+import json
+import statistics
+import time
+from random import Random
+
+from config import SERVICE_HOST, SERVICE_PORT
+from mazefile import unpack_walls
+
+#    ╔══════════════════════════════════════════════════════════════════════╗
+#    ║  Client and load tester for the local maze service (server.py).      ║
+#    ║                                                                      ║
+#    ║      client = await MazeClient.connect()                             ║
+#    ║      result = await client.solve(50, 50, seed=7, solver="astar")     ║
+#    ║                                                                      ║
+#    ║  Any number of requests may be in flight on one connection; answers  ║
+#    ║  are matched to them by id. The load test runs `concurrency`         ║
+#    ║  clients issuing a mix of ops over `distinct` seeds (fewer seeds,    ║
+#    ║  more cache hits and coalescing) and reports latency percentiles     ║
+#    ║  and throughput.                                                     ║
+#    ║                                                                      ║
+#    ║      python client.py --requests 5000 --concurrency 32 --distinct 50 ║
+#    ╚══════════════════════════════════════════════════════════════════════╝
+
+# longest response line, in bytes (a solved path or a maze's walls)
+RESPONSE_LIMIT = 1 << 26
+OPS = ("generate", "solve", "query")
+
+
+class ServiceError(Exception):
+    """Raised when the service rejects a request"""
+
+
+class MazeClient:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.next_id = 0
+        # request id -> future of its result
+        self.pending = {}
+        self.listener = asyncio.create_task(self._listen())
+
+    @classmethod
+    async def connect(cls, host=SERVICE_HOST, port=SERVICE_PORT):
+        reader, writer = await asyncio.open_connection(host, port, limit=RESPONSE_LIMIT)
+        return cls(reader, writer)
+
+    async def _listen(self):
+        try:
+            while line := await self.reader.readline():
+                response = json.loads(line)
+                future = self.pending.pop(response["id"], None)
+                if future is None or future.done():
+                    continue
+                if response["ok"]:
+                    future.set_result(response["result"])
+                else:
+                    future.set_exception(ServiceError(response["error"]))
+        finally:
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("connection to the maze service closed"))
+            self.pending.clear()
+
+    async def request(self, op, **params):
+        """Send one request and wait for its result"""
+        self.next_id += 1
+        request_id = self.next_id
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = future
+        self.writer.write(json.dumps({"id": request_id, "op": op, **params}).encode() + b"\n")
+        await self.writer.drain()
+        return await future
+
+    async def generate(self, cols, rows, generator="dfs", seed=None, braid=0.0, max_cost=1):
+        """The maze's result with its walls and costs decoded into bytearrays"""
+        result = await self.request(
+            "generate", cols=cols, rows=rows, generator=generator, seed=seed, braid=braid, max_cost=max_cost,
+        )
+        result["walls"] = unpack_walls(base64.b64decode(result["walls"]), cols * rows)
+        if result["costs"] is not None:
+            result["costs"] = bytearray(base64.b64decode(result["costs"]))
+        return result
+
+    async def solve(self, cols, rows, generator="dfs", seed=None, solver="bfs", braid=0.0, max_cost=1):
+        return await self.request(
+            "solve", cols=cols, rows=rows, generator=generator, seed=seed, solver=solver,
+            braid=braid, max_cost=max_cost,
+        )
+
+    async def query(self, cols, rows, pairs, generator="dfs", seed=None, paths=False):
+        return await self.request(
+            "query", cols=cols, rows=rows, generator=generator, seed=seed, pairs=pairs, paths=paths,
+        )
+
+    async def stats(self):
+        return await self.request("stats")
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+        await self.listener
+
+
+async def load_test(
+    host=SERVICE_HOST, port=SERVICE_PORT, requests=1000, concurrency=16, size=50,
+    distinct=20, ops=OPS, solver="bfs", pairs=10, seed=0,
+):
+    """Issue `requests` random requests from `concurrency` clients; returns a report dict"""
+    rng = Random(seed)
+    workload = []
+    for _ in range(requests):
+        op, maze_seed = rng.choice(ops), rng.randrange(distinct)
+        params = {"cols": size, "rows": size, "seed": maze_seed}
+        if op == "solve":
+            params["solver"] = solver
+        elif op == "query":
+            params["pairs"] = [
+                [[rng.randrange(size), rng.randrange(size)], [rng.randrange(size), rng.randrange(size)]]
+                for _ in range(pairs)
+            ]
+        workload.append((op, params))
+
+    latencies, errors = [], 0
+
+    async def run_client(client, share):
+        nonlocal errors
+        for op, params in share:
+            start = time.perf_counter()
+            try:
+                await client.request(op, **params)
+            except ServiceError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    clients = [await MazeClient.connect(host, port) for _ in range(concurrency)]
+    try:
+        before = await clients[0].stats()
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            run_client(client, workload[i::concurrency]) for i, client in enumerate(clients)
+        ))
+        elapsed = time.perf_counter() - start
+        after = await clients[0].stats()
+    finally:
+        for client in clients:
+            await client.close()
+
+    percentiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "elapsed_s": elapsed,
+        "requests_per_s": len(latencies) / elapsed,
+        "p50_ms": percentiles[49] * 1000,
+        "p99_ms": percentiles[98] * 1000,
+        "max_ms": max(latencies) * 1000,
+        # what the service did with this run's requests (the two stats requests included)
+        "server": {name: after[name] - before[name] for name in ("cache_hits", "coalesced", "computed")},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the local maze service")
+    parser.add_argument("--host", default=SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=SERVICE_PORT)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16, help="clients, each with one request in flight")
+    parser.add_argument("--size", type=int, default=50, help="side length of every maze")
+    parser.add_argument("--distinct", type=int, default=20, help="number of different maze seeds requested")
+    parser.add_argument("--ops", nargs="+", choices=OPS, default=list(OPS))
+    parser.add_argument("--solver", default="bfs")
+    parser.add_argument("--pairs", type=int, default=10, help="cell pairs per query")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random workload")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    report = asyncio.run(load_test(
+        args.host, args.port, args.requests, args.concurrency, args.size,
+        args.distinct, args.ops, args.solver, args.pairs, args.seed,
+    ))
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    server = report["server"]
+    print(f"{report['requests']} requests ({report['errors']} errors) in {report['elapsed_s']:.2f} s, "
+          f"{report['requests_per_s']:.1f} requests/s")
+    print(f"latency: p50 {report['p50_ms']:.2f} ms, p99 {report['p99_ms']:.2f} ms, max {report['max_ms']:.2f} ms")
+    print(f"service: {server['computed']} computed, {server['coalesced']} coalesced, "
+          f"{server['cache_hits']} cache hits")
+
+
+if __name__ == "__main__":
+    main()
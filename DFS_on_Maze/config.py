@@ -1,14 +1,16 @@
-import pygame
-
-# fonts
-pygame.font.init()
-FONT = pygame.font.SysFont("Arial", 24)
-SMALL_FONT = pygame.font.SysFont("Arial", 18)
+# fonts (created on first use, see fonts.py)
+FONT_FAMILY = "Arial"
+FONT_SIZE = 24
+SMALL_FONT_SIZE = 18
 
 # maze
 TILE_SIZE = 30
+# largest tile the camera zooms in to
+MAX_ZOOM_TILE = 64
 FPS = 60
 MAZE_LINE_WIDTH = 6
+# above this many cells the NumPy pixel renderer replaces per-cell drawing
+ARRAY_RENDER_THRESHOLD = 40000
 
 # window
 DEFAULT_WIDTH = 1680
@@ -16,3 +18,16 @@ DEFAULT_HEIGHT = 1050
 
 # Default
 SOLVING_SPEED = 50
+# solving steps per second are kept within these bounds by Up/Down
+MIN_STEPS_PER_SECOND = 1
+MAX_STEPS_PER_SECOND = 10_000_000
+# share of each frame the solver may use before the frame is drawn
+STEP_BUDGET = 0.6
+
+# local maze service (server.py)
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 8765
+# encoded results the service keeps in its LRU cache, in bytes
+SERVICE_CACHE_BYTES = 64 * 1024 * 1024
+# largest maze a request may ask for
+SERVICE_MAX_CELLS = 4_000_000
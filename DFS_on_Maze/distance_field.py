@@ -0,0 +1,138 @@
+from array import array
+
+import numpy as np
+
+from maze import BOTTOM, LEFT, RIGHT, TOP
+
+#    ╔══════════════════════════════════════════════════════════════════════╗
+#    ║  Distance fields for many agents heading to one or more goals.       ║
+#    ║                                                                      ║
+#    ║  One multi-source BFS from every goal at once labels each cell with  ║
+#    ║  its distance in steps to the nearest goal (cell costs are not       ║
+#    ║  counted). Wide BFS levels are expanded as NumPy arrays, narrow      ║
+#    ║  ones (long corridors, where a level is a handful of cells) in a     ║
+#    ║  plain loop over the same buffer. A second, fully vectorized pass    ║
+#    ║  points every cell at a neighbor one step closer, so an agent walks  ║
+#    ║  to its goal in O(path length) and a whole crowd advances one step   ║
+#    ║  with a single indexing operation. Works on mazes with loops too.    ║
+#    ╚══════════════════════════════════════════════════════════════════════╝
+
+# BFS levels with fewer cells than this are expanded without NumPy
+VECTOR_FRONTIER = 128
+
+
+class DistanceField:
+    """Distances from every cell to the nearest of `goals` (default: the maze goal)"""
+
+    def __init__(self, maze, goals=None):
+        self.maze = maze
+        cols = maze.cols
+        walls = maze.walls.unpack() if hasattr(maze.walls, "unpack") else maze.walls
+        deltas = maze.deltas
+        size = len(walls)
+        goals = goals if goals is not None else [maze.goal]
+        self.goals = sorted({maze.index(*goal) for goal in goals})
+        if not self.goals:
+            raise ValueError("DistanceField needs at least one goal")
+
+        # one buffer, written by the loop through `distance` and by NumPy through `dist`
+        distance = array("i", [-1]) * size
+        dist = np.frombuffer(distance, dtype=np.int32)
+        cell_walls = np.frombuffer(walls, dtype=np.uint8)
+        offsets = ((TOP, -cols), (RIGHT, 1), (BOTTOM, cols), (LEFT, -1))
+
+        frontier = self.goals
+        dist[frontier] = 0
+        level = 0
+        while len(frontier):
+            level += 1
+            if len(frontier) < VECTOR_FRONTIER:
+                found = []
+                for cell in frontier if isinstance(frontier, list) else frontier.tolist():
+                    for delta in deltas[walls[cell]]:
+                        neighbor = cell + delta
+                        if distance[neighbor] == -1:
+                            distance[neighbor] = level
+                            found.append(neighbor)
+                frontier = found
+                continue
+            frontier = np.asarray(frontier)
+            masks = cell_walls[frontier]
+            found = []
+            for side, delta in offsets:
+                # one neighbor per frontier cell and side, so no duplicates within a side
+                neighbors = frontier[(masks & side) == 0] + delta
+                neighbors = neighbors[dist[neighbors] == -1]
+                dist[neighbors] = level
+                found.append(neighbors)
+            frontier = np.concatenate(found)
+
+        # next_cell[i] is a neighbor of i one step closer to a goal (goals point at
+        # themselves, unreachable cells at -1)
+        following = array("i", [-1]) * size
+        next_cell = np.frombuffer(following, dtype=np.int32)
+        for side, delta in offsets:
+            cells = np.flatnonzero(((cell_walls & side) == 0) & (next_cell == -1) & (dist > 0))
+            neighbors = cells + delta
+            closer = dist[neighbors] == dist[cells] - 1
+            next_cell[cells[closer]] = neighbors[closer]
+        next_cell[self.goals] = self.goals
+
+        self.cols = cols
+        self.dist = dist
+        self.next_cell = next_cell
+        # the same buffers, for walking one path without NumPy scalar overhead
+        self._distance = distance
+        self._following = following
+        self._nearest = None
+
+    def grid(self):
+        """Distances as a (rows, cols) array, -1 where no goal is reachable"""
+        return self.dist.reshape(self.maze.rows, self.cols)
+
+    def indices(self, cells):
+        """Cell indices of a sequence of (x, y), as an array"""
+        cells = np.asarray(cells, dtype=np.int64).reshape(-1, 2)
+        return cells[:, 0] + cells[:, 1] * self.cols
+
+    def distance(self, cell):
+        """Steps from cell (x, y) to the nearest goal, -1 if none is reachable"""
+        return int(self.dist[self.maze.index(*cell)])
+
+    def distances(self, cells):
+        """distance() for every cell, as an array"""
+        return self.dist[self.indices(cells)]
+
+    def path(self, cell):
+        """The path from cell (x, y) down to its nearest goal, as a list of (x, y)"""
+        cols, following = self.cols, self._following
+        current = self.maze.index(*cell)
+        if following[current] == -1:
+            raise ValueError(f"no goal is reachable from {cell}")
+        path = [current]
+        for _ in range(self._distance[current]):
+            current = following[current]
+            path.append(current)
+        return [(i % cols, i // cols) for i in path]
+
+    def paths(self, cells):
+        """path() for every cell"""
+        return [self.path(cell) for cell in cells]
+
+    def step(self, positions):
+        """Advance agents at cell indices `positions` one step each (agents on a goal
+        stay there); returns the new positions"""
+        return self.next_cell[positions]
+
+    def nearest_goals(self, cells):
+        """The goal, as (x, y), that each cell's path leads to"""
+        if self._nearest is None:
+            # pointer doubling over next_cell: after k rounds every cell points 2**k
+            # steps ahead, and goals point at themselves
+            nearest = self.next_cell.copy()
+            for _ in range(int(self.dist.max()).bit_length()):
+                reachable = nearest >= 0
+                nearest[reachable] = nearest[nearest[reachable]]
+            self._nearest = nearest
+        indices = self._nearest[self.indices(cells)]
+        return [(int(i) % self.cols, int(i) // self.cols) if i >= 0 else None for i in indices]
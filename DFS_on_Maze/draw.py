@@ -1,24 +1,101 @@
 import pygame
 from colors import BLACK, GREEN, ORANGE, WHITE, GRAY, L_GREEN, D_YELLOW, L_GRAY
-from config import MAZE_LINE_WIDTH, TILE_SIZE
+from config import (
+    ARRAY_RENDER_THRESHOLD, DEFAULT_HEIGHT, DEFAULT_WIDTH, MAZE_LINE_WIDTH, SMALL_FONT_SIZE, TILE_SIZE,
+)
+from fonts import get_font
+from instrument import instruments
 
 #    ╔══════════════════════════════════════════════════════════════════════╗
-#    ║    draw_element(screen, type {arrow, cell, walls}, *args, **kwargs)  ║
-#    ║    handles all types.                                                ║
+#    ║    draw_maze() is incremental: it remembers what the last frame      ║
+#    ║    showed, repaints only the cells whose state changed and returns   ║
+#    ║    their rects for pygame.display.update(). An empty list means the  ║
+#    ║    frame can be skipped.                                             ║
 #    ╚══════════════════════════════════════════════════════════════════════╝
 
+NO_CELLS = frozenset()
+# fills the transparent parts of the cached wall layer
+WALL_LAYER_KEY = (255, 0, 255)
+
+def path_directions(path):
+    """Map each path cell to the arrow pointing at the next one (None for the last)"""
+    directions = {}
+    for (x, y), (next_x, next_y) in zip(path, path[1:]):
+        directions[(x, y)] = (
+            "right" if next_x > x else
+            "left" if next_x < x else
+            "down" if next_y > y else
+            "up"
+        )
+    if path:
+        directions.setdefault(path[-1], None)
+    return directions
+
+
 class Drawing:
-    def __init__(self, screen):
+    def __init__(self, screen, tile_size=TILE_SIZE):
         self.screen = screen
-        self.tile_size = TILE_SIZE
-        self.line_width = MAZE_LINE_WIDTH
+        self.tile_size = tile_size
+        self.line_width = max(1, min(MAZE_LINE_WIDTH, tile_size // 5))
+        # last rendered info text, ((text, size), surface)
+        self._info_text = None
+        # area the overlay has covered so far; it only grows so old text never shows
+        self._overlay_rect = pygame.Rect(0, 0, 0, 0)
+        self.invalidate()
+        self.invalidate_static()
+
+    def invalidate(self):
+        """Forget the last frame so the next draw_maze repaints everything"""
+        self._grid = None
+        self._size = None
+        self._explored = None
+        self._explored_count = 0
+        self._drawn_explored = set()
+        self._path = None
+        self._path_len = 0
+        self._path_directions = {}
+        self._failed = False
+
+    def invalidate_static(self):
+        """Drop the cached grid and wall layers, e.g. after editing walls in place"""
+        self._static_key = None
+        self._base_layer = self._wall_layer = None
+
+    @instruments.timed("draw.static_layers")
+    def static_layers(self, grid_cells, cols, rows):
+        """Background+grid and wall layers, rendered once per maze and tile size"""
+        walls = getattr(getattr(grid_cells, "maze", None), "walls", None)
+        key = self._static_key
+        if (
+            key is None
+            or key[0] is not grid_cells
+            or key[1] is not walls
+            or key[2:] != (cols, rows, self.tile_size)
+        ):
+            size = (cols * self.tile_size, rows * self.tile_size)
+            base = pygame.Surface(size)
+            base.fill(L_GREEN)
+            self.draw_grid(cols, rows, base)
 
-    def draw_grid(self, cols, rows):
+            wall_layer = pygame.Surface(size)
+            wall_layer.fill(WALL_LAYER_KEY)
+            for cell in grid_cells:
+                self.draw_walls(cell, wall_layer)
+            wall_layer.set_colorkey(WALL_LAYER_KEY)
+
+            if pygame.display.get_surface() is not None:
+                base, wall_layer = base.convert(), wall_layer.convert()
+            self._base_layer, self._wall_layer = base, wall_layer
+            self._static_key = (grid_cells, walls, cols, rows, self.tile_size)
+        return self._base_layer, self._wall_layer
+
+    def draw_grid(self, cols, rows, surface=None):
         """Draws a light gray grid on the screen."""
+        surface = self.screen if surface is None else surface
         for x in range(cols):
             for y in range(rows):
                 rect = (x * self.tile_size, y * self.tile_size, self.tile_size, self.tile_size)
-                pygame.draw.rect(self.screen, L_GRAY, rect, 1)
+                pygame.draw.rect(surface, L_GRAY, rect, 1)
 
     def draw_arrow(self, x, y, direction):
         """Draw an arrow indicating path direction"""
@@ -43,12 +120,13 @@ class Drawing:
             (x * self.tile_size, y * self.tile_size, self.tile_size, self.tile_size)
         )
 
-    def draw_walls(self, cell):
+    def draw_walls(self, cell, surface=None):
         """Draw the walls of a cell"""
+        surface = self.screen if surface is None else surface
         x, y = cell.x * self.tile_size, cell.y * self.tile_size
         if cell.walls.get("top"):
             pygame.draw.line(
-                self.screen, 
+                surface, 
                 BLACK, 
                 (x, y), 
                 (x + self.tile_size, y), 
@@ -56,7 +134,7 @@ class Drawing:
             )
         if cell.walls.get("right"):
             pygame.draw.line(
-                self.screen, 
+                surface, 
                 BLACK, 
                 (x + self.tile_size, y), 
                 (x + self.tile_size, y + self.tile_size), 
@@ -64,7 +142,7 @@ class Drawing:
             )
         if cell.walls.get("bottom"):
             pygame.draw.line(
-                self.screen, 
+                surface, 
                 BLACK, 
                 (x + self.tile_size, y + self.tile_size), 
                 (x, y + self.tile_size), 
@@ -72,49 +150,117 @@ class Drawing:
             )
         if cell.walls.get("left"):
             pygame.draw.line(
-                self.screen, 
+                surface, 
                 BLACK, 
                 (x, y + self.tile_size), 
                 (x, y), 
                 self.line_width
             )
 
-    def draw_maze(self, grid_cells, cols, rows, explored=None, path=None, failed=False):
-        """Draw the complete maze with all its components"""
+    @instruments.timed("draw.draw_maze")
+    def draw_maze(self, grid_cells, cols, rows, explored=None, path=None, failed=False, changed=None):
+        """Draw the maze, repainting only what changed since the last call.
+
+        The grid and walls come from cached layers (see static_layers), so a
+        full frame is a fill, two blits and the explored/path cells.
+
+        `changed` optionally lists the cells known to be newly explored, which
+        spares diffing the explored set. Returns the list of dirty rects.
+        """
+        explored = explored if explored is not None else NO_CELLS
+        path = path or []
+        failed = bool(failed)
+
+        if (
+            grid_cells is not self._grid
+            or (cols, rows) != self._size
+            or explored is not self._explored
+            or len(explored) < self._explored_count
+        ):
+            self._grid, self._size = grid_cells, (cols, rows)
+            self._explored, self._explored_count = explored, len(explored)
+            self._drawn_explored = set(explored)
+            self._path, self._path_len = path, len(path)
+            self._path_directions = path_directions(path)
+            self._failed = failed
+            self._draw_full(grid_cells, cols, rows)
+            return [self.screen.get_rect()]
+
+        dirty = set()
+        if len(explored) != self._explored_count:
+            if changed is not None and len(changed) == len(explored) - self._explored_count:
+                dirty.update(changed)
+            else:
+                dirty.update(explored - self._drawn_explored)
+            self._drawn_explored.update(dirty)
+            self._explored_count = len(explored)
+
+        if path is not self._path or len(path) != self._path_len or failed != self._failed:
+            directions = path_directions(path)
+            if failed != self._failed:
+                dirty.update(directions)
+                dirty.update(self._path_directions)
+            else:
+                for cell in directions.keys() | self._path_directions.keys():
+                    if directions.get(cell, False) != self._path_directions.get(cell, False):
+                        dirty.add(cell)
+            self._path, self._path_len = path, len(path)
+            self._path_directions = directions
+            self._failed = failed
+
+        return self._repaint_cells(grid_cells, cols, rows, dirty) if dirty else []
+
+    @instruments.timed("draw.draw_full")
+    def _draw_full(self, grid_cells, cols, rows):
+        """Paint the whole remembered state"""
+        base, wall_layer = self.static_layers(grid_cells, cols, rows)
         self.screen.fill(L_GREEN)
 
         # Draw the grid
-        self.draw_grid(cols, rows)
+        self.screen.blit(base, (0, 0))
 
         # Draw explored cells
-        if explored:
-            for x, y in explored:
-                self.draw_cell(x, y, D_YELLOW)
+        for x, y in self._drawn_explored:
+            self.draw_cell(x, y, D_YELLOW)
 
         # Draw path
-        if path:
-            path_color = GREEN if not failed else ORANGE
-            for x, y in path:
-                self.draw_cell(x, y, path_color)
-
-            # Draw arrows along the path
-            for (x, y), (next_x, next_y) in zip(path, path[1:]):
-                direction = (
-                    "right" if next_x > x else
-                    "left" if next_x < x else
-                    "down" if next_y > y else
-                    "up"
-                )
+        path_color = GREEN if not self._failed else ORANGE
+        for x, y in self._path_directions:
+            self.draw_cell(x, y, path_color)
+
+        # Draw arrows along the path
+        for (x, y), direction in self._path_directions.items():
+            if direction:
                 self.draw_arrow(x, y, direction)
 
         # Draw walls
-        for cell in grid_cells:
-            self.draw_walls(cell)
+        self.screen.blit(wall_layer, (0, 0))
+
+    @instruments.timed("draw.repaint_cells")
+    def _repaint_cells(self, grid_cells, cols, rows, cells):
+        return [self._repaint_cell(grid_cells, cols, rows, x, y) for x, y in cells]
 
+    def _repaint_cell(self, grid_cells, cols, rows, x, y):
+        """Repaint one tile from the remembered state and the cached static layers"""
+        base, wall_layer = self.static_layers(grid_cells, cols, rows)
+        rect = pygame.Rect(x * self.tile_size, y * self.tile_size, self.tile_size, self.tile_size)
+        self.screen.blit(base, rect, rect)
+        if (x, y) in self._path_directions:
+            self.draw_cell(x, y, GREEN if not self._failed else ORANGE)
+            if self._path_directions[(x, y)]:
+                self.draw_arrow(x, y, self._path_directions[(x, y)])
+        elif (x, y) in self._drawn_explored:
+            self.draw_cell(x, y, D_YELLOW)
+        self.screen.blit(wall_layer, rect, rect)
+        return rect
+
+    @instruments.timed("draw.draw_info_text")
     def draw_info_text(self, text, font_size=24):
         """Draw centered info text with background"""
-        info_font = pygame.font.SysFont("Arial", font_size)
-        info_text = info_font.render(text, True, BLACK)
+        key = (text, font_size)
+        if self._info_text is None or self._info_text[0] != key:
+            self._info_text = (key, get_font(font_size).render(text, True, BLACK))
+        info_text = self._info_text[1]
         info_rect = info_text.get_rect(
             center=(self.screen.get_width() // 2, self.screen.get_height() // 2)
         )
@@ -123,8 +269,75 @@ class Drawing:
         pygame.draw.rect(self.screen, GRAY, info_box)
         pygame.draw.rect(self.screen, BLACK, info_box, 2)
         self.screen.blit(info_text, info_rect)
+        return info_box
+
+    @instruments.timed("draw.overlay")
+    def draw_overlay(self, lines, font_size=SMALL_FONT_SIZE):
+        """Draw lines of text in a box at the top left; returns the box rect"""
+        font = get_font(font_size)
+        rendered = [font.render(line, True, BLACK) for line in lines]
+        padding = 4
+        width = max(text.get_width() for text in rendered) + padding * 2
+        height = sum(text.get_height() for text in rendered) + padding * 2
+        self._overlay_rect = self._overlay_rect.union(pygame.Rect(0, 0, width, height))
+        pygame.draw.rect(self.screen, WHITE, self._overlay_rect)
+        y = padding
+        for text in rendered:
+            self.screen.blit(text, (padding, y))
+            y += text.get_height()
+        return self._overlay_rect
+
+
+class StepRenderer:
+    """Solver observer that animates every search step on screen"""
+
+    def __init__(self, screen, draw_maze_func, grid_cells, cols, rows, solving_speed):
+        self.screen = screen
+        self.draw_maze_func = draw_maze_func
+        self.grid_cells = grid_cells
+        self.cols, self.rows = cols, rows
+        self.solving_speed = solving_speed
+
+    def __call__(self, explored, path=None, failed=False, cell=None):
+        if path is None:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    pygame.quit()
+                    return False
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_UP:
+                        self.solving_speed = max(5, self.solving_speed - 5)
+                    elif event.key == pygame.K_DOWN:
+                        self.solving_speed = min(500, self.solving_speed + 5)
+            pygame.time.delay(self.solving_speed)
+
+        dirty = self.draw_maze_func(
+            self.grid_cells, self.cols, self.rows, explored, path, failed=failed,
+            changed=[cell] if cell is not None else None,
+        )
+        if dirty is None:
+            pygame.display.flip()
+        elif dirty:
+            pygame.display.update(dirty)
+        return True
+
+def make_drawing(screen, cols, rows, tile_size=TILE_SIZE):
+    """Pick the renderer for a maze: per-cell pygame drawing for mazes that fit the
+    window at `tile_size`, the NumPy viewport renderer with a zoom/pan camera for
+    mazes that do not (long, thin ones included) or that have more than
+    ARRAY_RENDER_THRESHOLD cells (if NumPy is available)"""
+    fits = cols * tile_size <= DEFAULT_WIDTH and rows * tile_size <= DEFAULT_HEIGHT
+    if not fits or cols * rows > ARRAY_RENDER_THRESHOLD:
+        try:
+            from draw_array import CameraDrawing
+        except ImportError:
+            pass
+        else:
+            from camera import Camera
+            return CameraDrawing(screen, Camera(cols, rows, *screen.get_size()))
+    return Drawing(screen, tile_size)
 
 # For backwards compatibility
-def draw_maze(screen, grid_cells, cols, rows, explored=None, path=None, failed=False):
+def draw_maze(screen, grid_cells, cols, rows, explored=None, path=None, failed=False, changed=None):
     drawer = Drawing(screen)
-    drawer.draw_maze(grid_cells, cols, rows, explored, path, failed)
+    return drawer.draw_maze(grid_cells, cols, rows, explored, path, failed, changed)
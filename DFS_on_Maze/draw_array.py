@@ -0,0 +1,285 @@
+from itertools import chain
+
+import numpy as np
+import pygame
+from colors import BLACK, D_YELLOW, GRAY, GREEN, L_GRAY, L_GREEN, ORANGE
+from config import MAZE_LINE_WIDTH
+from draw import Drawing
+from instrument import instruments
+from maze import BOTTOM, LEFT, RIGHT, TOP
+
+#    ╔══════════════════════════════════════════════════════════════════════╗
+#    ║    NumPy pixel renderer for very large mazes.                        ║
+#    ║                                                                      ║
+#    ║    Keeps one state byte per cell (unvisited/explored/path/failed),   ║
+#    ║    maps it to colors with a lookup table, upscales it by the tile    ║
+#    ║    size and writes it into the display through pygame.surfarray in   ║
+#    ║    one operation. Grid and walls come from a per-pixel overlay that  ║
+#    ║    is built once per maze. Tiles can be as small as 1 pixel; walls   ║
+#    ║    need 3 pixels and the grid 4, path arrows are not drawn.          ║
+#    ╚══════════════════════════════════════════════════════════════════════╝
+
+UNVISITED, EXPLORED, PATH, FAILED = 0, 1, 2, 3
+STATE_COLORS = [L_GREEN, D_YELLOW, GREEN, ORANGE]
+
+# overlay values, pre-multiplied so that `state + overlay` indexes PIXEL_COLORS
+NO_OVERLAY, GRID, WALL = 0, 4, 8
+PIXEL_COLORS = np.array(
+    STATE_COLORS                                  # no overlay
+    + [L_GRAY] + STATE_COLORS[1:]                 # grid lines only show on unvisited cells
+    + [BLACK] * 4,                                # walls
+    dtype=np.uint8,
+)
+
+
+def wall_overlay(cell_walls, tile, line_width):
+    """Per-pixel GRID/WALL overlay for a [x, y] array of wall masks"""
+    cols, rows = cell_walls.shape
+    overlay = np.zeros((cols * tile, rows * tile), dtype=np.uint8)
+    if tile < 3:
+        return overlay
+
+    local = np.arange(tile)
+    if tile >= 4:
+        edge = (local == 0) | (local == tile - 1)
+        overlay[np.tile(edge, cols), :] = GRID
+        overlay[:, np.tile(edge, rows)] = GRID
+
+    # each cell paints its half of every wall line that borders it
+    half = max(1, line_width // 2)
+    near, far = local < half, local >= tile - half
+    pixel_walls = np.repeat(np.repeat(cell_walls, tile, axis=0), tile, axis=1)
+    near_x, far_x = np.tile(near, cols)[:, None], np.tile(far, cols)[:, None]
+    near_y, far_y = np.tile(near, rows)[None, :], np.tile(far, rows)[None, :]
+    overlay[
+        ((pixel_walls & TOP) != 0) & near_y
+        | ((pixel_walls & BOTTOM) != 0) & far_y
+        | ((pixel_walls & LEFT) != 0) & near_x
+        | ((pixel_walls & RIGHT) != 0) & far_x
+    ] = WALL
+    return overlay
+
+
+class ArrayDrawing(Drawing):
+    def invalidate_static(self):
+        super().invalidate_static()
+        self._overlay = None
+
+    @instruments.timed("draw.static_layers")
+    def static_layers(self, grid_cells, cols, rows):
+        """Per-pixel overlay (GRID/WALL), indexed [x, y] like surfarray"""
+        walls = grid_cells.maze.walls
+        key = self._static_key
+        if (
+            key is None
+            or key[0] is not grid_cells
+            or key[1] is not walls
+            or key[2:] != (cols, rows, self.tile_size)
+        ):
+            self._overlay = self._build_overlay(walls, cols, rows)
+            self._static_key = (grid_cells, walls, cols, rows, self.tile_size)
+        return self._overlay
+
+    def _build_overlay(self, walls, cols, rows):
+        cell_walls = np.frombuffer(walls, dtype=np.uint8).reshape(rows, cols).T
+        return wall_overlay(cell_walls, self.tile_size, self.line_width)
+
+    @instruments.timed("draw.draw_full")
+    def _draw_full(self, grid_cells, cols, rows):
+        self.static_layers(grid_cells, cols, rows)
+        self._build_state(cols, rows)
+        self.screen.fill(L_GREEN)
+        self._blit_region(0, 0, cols, rows)
+
+    @instruments.timed("draw.repaint_cells")
+    def _repaint_cells(self, grid_cells, cols, rows, cells):
+        self.static_layers(grid_cells, cols, rows)
+        xs, ys = self._update_state(cells)
+        return [self._blit_region(int(xs.min()), int(ys.min()), int(xs.max()) + 1, int(ys.max()) + 1)]
+
+    def _build_state(self, cols, rows):
+        """State of every cell (unvisited, explored or on the path), indexed [x, y]"""
+        self._state = np.zeros((cols, rows), dtype=np.uint8)
+        for cells, value in (
+            (self._drawn_explored, EXPLORED),
+            (self._path_directions, FAILED if self._failed else PATH),
+        ):
+            if cells:
+                coords = np.fromiter(chain.from_iterable(cells), dtype=np.intp, count=2 * len(cells))
+                self._state[coords[0::2], coords[1::2]] = value
+
+    def _update_state(self, cells):
+        """Store the state of a set of changed cells; returns their coordinates as arrays"""
+        # a solver step can change tens of thousands of cells: nearly all of them are newly
+        # explored, so write that in one go and only visit the exceptions in Python
+        coords = np.fromiter(chain.from_iterable(cells), dtype=np.intp, count=2 * len(cells))
+        xs, ys = coords[0::2], coords[1::2]
+        self._state[xs, ys] = EXPLORED
+        for cell in cells - self._drawn_explored:
+            self._state[cell] = UNVISITED
+        path_state = FAILED if self._failed else PATH
+        for cell in cells & self._path_directions.keys():
+            self._state[cell] = path_state
+        return xs, ys
+
+    def _blit_region(self, x0, y0, x1, y1):
+        """Color, upscale and write cells [x0, x1) x [y0, y1) into the screen"""
+        tile = self.tile_size
+        state = self._state[x0:x1, y0:y1]
+        if tile > 1:
+            width, height = state.shape
+            state = np.broadcast_to(
+                state[:, None, :, None], (width, tile, height, tile)
+            ).reshape(width * tile, height * tile)
+        pixels = PIXEL_COLORS[state + self._overlay[x0 * tile:x1 * tile, y0 * tile:y1 * tile]]
+
+        screen_pixels = pygame.surfarray.pixels3d(self.screen)
+        screen_pixels[x0 * tile:x1 * tile, y0 * tile:y1 * tile] = pixels
+        del screen_pixels
+        return pygame.Rect(x0 * tile, y0 * tile, (x1 - x0) * tile, (y1 - y0) * tile)
+
+
+class CameraDrawing(ArrayDrawing):
+    """Pixel renderer limited to a Camera's viewport.
+
+    Keeps the per-cell state for the whole maze but only turns the visible
+    cells into pixels, so the cost of a frame depends on the window size,
+    not the maze size. Each tile is looked up whole from a table of every
+    (state, wall mask) combination, already mapped to the screen's pixel
+    format. When the camera is zoomed out past one pixel per cell, each
+    pixel shows the most advanced state (path > explored > unvisited) of
+    its block.
+    """
+
+    def __init__(self, screen, camera):
+        self.camera = camera
+        self._camera_version = None
+        self._state = None
+        self._tiles_key = None
+        super().__init__(screen, camera.tile)
+
+    def static_layers(self, grid_cells, cols, rows):
+        # walls are read straight from the maze for the visible window only
+        walls = grid_cells.maze.walls
+        if self._static_key is None or self._static_key[0] is not walls:
+            self._walls = np.frombuffer(walls, dtype=np.uint8).reshape(rows, cols).T
+            self._static_key = (walls,)
+        return None
+
+    def tile_pixels(self):
+        """Mapped pixels of every tile, indexed [state * 16 + wall mask, x, y]"""
+        tile = self.camera.tile
+        key = (tile, self.line_width, self.screen.get_bitsize())
+        if self._tiles_key != key:
+            patterns = np.stack([
+                wall_overlay(np.array([[mask]], dtype=np.uint8), tile, self.line_width)
+                for mask in range(16)
+            ])
+            mapped = np.array([self.screen.map_rgb(tuple(color)) for color in PIXEL_COLORS], dtype=np.uint32)
+            states = np.arange(len(STATE_COLORS), dtype=np.uint8)[:, None, None, None]
+            self._tiles = mapped[states + patterns[None]].reshape(-1, tile, tile)
+            self._palette = mapped[:len(STATE_COLORS)]
+            self._tiles_key = key
+        return self._tiles
+
+    def draw_maze(self, grid_cells, cols, rows, explored=None, path=None, failed=False, changed=None):
+        dirty = super().draw_maze(grid_cells, cols, rows, explored, path, failed, changed)
+        if self.camera.version != self._camera_version:
+            self._draw_view()
+            return [self.screen.get_rect()]
+        return dirty
+
+    @instruments.timed("draw.draw_full")
+    def _draw_full(self, grid_cells, cols, rows):
+        self.static_layers(grid_cells, cols, rows)
+        self._build_state(cols, rows)
+        self._draw_view()
+
+    def _draw_view(self):
+        self._camera_version = self.camera.version
+        self.line_width = max(1, min(MAZE_LINE_WIDTH, self.camera.tile // 5))
+        x0, y0, x1, y1 = self.camera.visible()
+        rect = self._blit_region(x0, y0, x1, y1)
+        # the maze may not reach the right or bottom edge of the window
+        width, height = self.screen.get_size()
+        if rect.right < width:
+            self.screen.fill(GRAY, (rect.right, 0, width - rect.right, height))
+        if rect.bottom < height:
+            self.screen.fill(GRAY, (0, rect.bottom, width, height - rect.bottom))
+
+    @instruments.timed("draw.repaint_cells")
+    def _repaint_cells(self, grid_cells, cols, rows, cells):
+        xs, ys = self._update_state(cells)
+        if self.camera.version != self._camera_version:
+            # draw_maze repaints the whole view next
+            return []
+        x0, y0, x1, y1 = self.camera.visible()
+        visible = (xs >= x0) & (xs < x1) & (ys >= y0) & (ys < y1)
+        xs, ys = xs[visible], ys[visible]
+        if not len(xs):
+            return []
+        if self.camera.step > 1:
+            return [self._repaint_blocks(xs, ys)]
+        return [self._blit_region(int(xs.min()), int(ys.min()), int(xs.max()) + 1, int(ys.max()) + 1)]
+
+    def _repaint_blocks(self, xs, ys):
+        """Recolor the overview pixels holding cells (xs, ys); cost grows with the cells, not the view"""
+        step = self.camera.step
+        view_x0, view_y0, view_x1, view_y1 = self.camera.visible()
+        blocks = np.unique(((xs - view_x0) // step) * (1 << 32) + (ys - view_y0) // step)
+        block_x, block_y = blocks >> 32, blocks & 0xFFFFFFFF
+        # every cell of each block, clipped at the maze edge (where blocks may be partial)
+        local = np.arange(step)
+        cell_x = np.minimum(view_x0 + block_x[:, None] * step + local, view_x1 - 1)
+        cell_y = np.minimum(view_y0 + block_y[:, None] * step + local, view_y1 - 1)
+        states = self._state[cell_x[:, :, None], cell_y[:, None, :]].max(axis=(1, 2))
+
+        self.tile_pixels()
+        screen_pixels = pygame.surfarray.pixels2d(self.screen)
+        screen_pixels[block_x, block_y] = self._palette[states]
+        del screen_pixels
+        left, top = int(block_x.min()), int(block_y.min())
+        return pygame.Rect(left, top, int(block_x.max()) - left + 1, int(block_y.max()) - top + 1)
+
+    def _blit_region(self, x0, y0, x1, y1):
+        """Draw the visible part of cells [x0, x1) x [y0, y1); returns its screen rect"""
+        camera = self.camera
+        tile, step = camera.tile, camera.step
+        view_x0, view_y0, view_x1, view_y1 = camera.visible()
+        tiles = self.tile_pixels()
+        if step > 1:
+            # widen to whole blocks of the overview grid
+            x0 = view_x0 + (x0 - view_x0) // step * step
+            y0 = view_y0 + (y0 - view_y0) // step * step
+            x1 = min(view_x1, view_x0 + -(-(x1 - view_x0) // step) * step)
+            y1 = min(view_y1, view_y0 + -(-(y1 - view_y0) // step) * step)
+            state = self._state[x0:x1, y0:y1]
+            width, height = -(-(x1 - x0) // step), -(-(y1 - y0) // step)
+            if state.shape != (width * step, height * step):
+                padded = np.zeros((width * step, height * step), dtype=np.uint8)
+                padded[:x1 - x0, :y1 - y0] = state
+                state = padded
+            # strided maxima are much faster than reducing over a reshaped block axis
+            blocks = state[::step, ::step].copy()
+            for i in range(step):
+                for j in range(step):
+                    np.maximum(blocks, state[i::step, j::step], out=blocks)
+            pixels = self._palette[blocks]
+            left, top = (x0 - view_x0) // step, (y0 - view_y0) // step
+        else:
+            codes = self._state[x0:x1, y0:y1] * 16 + self._walls[x0:x1, y0:y1]
+            width, height = codes.shape
+            pixels = tiles[codes]
+            if tile > 1:
+                pixels = pixels.transpose(0, 2, 1, 3).reshape(width * tile, height * tile)
+            else:
+                pixels = pixels.reshape(width, height)
+            left, top = (x0 - view_x0) * tile, (y0 - view_y0) * tile
+
+        # the last row and column of cells may only partly fit the window
+        width = min(pixels.shape[0], self.screen.get_width() - left)
+        height = min(pixels.shape[1], self.screen.get_height() - top)
+        screen_pixels = pygame.surfarray.pixels2d(self.screen)
+        screen_pixels[left:left + width, top:top + height] = pixels[:width, :height]
+        del screen_pixels
+        return pygame.Rect(left, top, width, height)
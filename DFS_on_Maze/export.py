@@ -0,0 +1,330 @@
+import argparse
+import os
+import struct
+import tempfile
+import time
+from array import array
+
+import numpy as np
+import pygame
+
+from batch import run_batch
+from camera import Camera
+from colors import GRAY
+from config import DEFAULT_HEIGHT, DEFAULT_WIDTH
+from draw_array import PIXEL_COLORS, CameraDrawing
+from maze import Maze
+from mazefile import load_maze, read_events, read_header, save_walls, seed_arg
+
+#    ╔══════════════════════════════════════════════════════════════════════╗
+#    ║  Offline export of solver runs to a PNG sequence or animated GIF.    ║
+#    ║                                                                      ║
+#    ║  The search runs headlessly at full speed and only its event log is  ║
+#    ║  kept: the cells in the order they were explored plus the final      ║
+#    ║  path, saved as a maze file with the EVENTS section (mazefile.py).   ║
+#    ║  Frames are then rendered from that file over a process pool (see    ║
+#    ║  batch.run_batch) onto off-screen surfaces, each worker drawing a    ║
+#    ║  run of consecutive frames incrementally. GIF frames only hold the   ║
+#    ║  rectangle that changed since the previous frame and are LZW-encoded ║
+#    ║  in the workers; the parent just stitches them together in order.    ║
+#    ║  The interactive speed setting plays no part.                        ║
+#    ║                                                                      ║
+#    ║      python export.py run.gif --size 100 --solver astar              ║
+#    ║      python export.py frames/ --load big.maze --frames 600           ║
+#    ╚══════════════════════════════════════════════════════════════════════╝
+
+DEFAULT_FRAMES = 200
+DEFAULT_DELAY_MS = 40
+# how long a GIF shows the solved maze before looping
+FINAL_DELAY_MS = 2000
+PNG_NAME = "frame_%06d.png"
+
+# every color a frame can contain, padded to a power of two for the GIF color table
+GIF_PALETTE = list(dict.fromkeys([tuple(int(c) for c in color) for color in PIXEL_COLORS] + [GRAY]))
+GIF_PALETTE += [(0, 0, 0)] * (16 - len(GIF_PALETTE))
+GIF_CODE_SIZE = 4
+
+
+def record_events(maze, solver="bfs"):
+    """Run a search headlessly; returns (explored, path, found), explored being an
+    array("I") of cell indices in the order the solver explored them"""
+    cols = maze.cols
+    explored = array("I")
+    search = maze.search(solver)
+    while not search.done:
+        explored.extend(x + y * cols for x, y in search.step(1 << 16))
+    return explored, search.path, search.found
+
+
+def save_events(path, maze, explored, solution):
+    """Write the maze with its solution and exploration order as an event log"""
+    save_walls(path, maze.walls, maze.cols, maze.rows, maze.seed, maze.generator, solution, events=explored)
+
+
+def load_events(path):
+    """Read an event log; returns (maze, explored, path, found)"""
+    (cols, rows, seed, generator, _), walls, solution = load_maze(path)
+    with open(path, "rb") as f:
+        explored = read_events(f, cols, rows)
+    cells, found = solution
+    return Maze(cols, rows, generator, seed, walls=walls), explored, cells, found
+
+
+def frame_size(cols, rows):
+    """Same size as the interactive window would be"""
+    from ui import fit_tile_size
+
+    tile = fit_tile_size(cols, rows)
+    return min(cols * tile, DEFAULT_WIDTH), min(rows * tile, DEFAULT_HEIGHT)
+
+
+class FrameRenderer:
+    """Draws the frames of one event log onto an off-screen surface.
+
+    Frame n shows the first n * steps_per_frame explored cells; the last
+    frame also shows the path. Frames are cheapest drawn in order.
+    """
+
+    def __init__(self, maze, explored, path, found, size, steps_per_frame):
+        self.maze = maze
+        self.explored = explored
+        self.path = path
+        self.found = found
+        self.steps_per_frame = steps_per_frame
+        self.last_frame = -(-len(explored) // steps_per_frame)
+        self.surface = pygame.Surface(size)
+        self.drawer = CameraDrawing(self.surface, Camera(maze.cols, maze.rows, *size))
+        self._reset()
+
+    def _reset(self):
+        self.drawer.invalidate()
+        self.cells = set()
+        self.shown = 0
+        self.number = -1
+
+    def draw(self, number):
+        """Draw frame `number`; returns the rect that changed since frame number - 1"""
+        if number <= self.number:
+            self._reset()
+        if 0 < number and self.number != number - 1:
+            self._advance(number - 1)
+        return self._advance(number)
+
+    def _advance(self, number):
+        maze, cols = self.maze, self.maze.cols
+        end = min(number * self.steps_per_frame, len(self.explored))
+        new = [(i % cols, i // cols) for i in self.explored[self.shown:end]]
+        self.cells.update(new)
+        self.shown, self.number = end, number
+        final = number >= self.last_frame
+        dirty = self.drawer.draw_maze(
+            maze.grid_cells, maze.cols, maze.rows, self.cells,
+            self.path if final else [], failed=final and not self.found, changed=new,
+        )
+        # an unchanged frame still needs a (one pixel) image in a GIF
+        return dirty[0].unionall(dirty[1:]) if dirty else pygame.Rect(0, 0, 1, 1)
+
+
+def lzw_encode(data, code_size=GIF_CODE_SIZE):
+    """GIF flavoured LZW of a bytes of palette indices, split into data sub-blocks"""
+    clear, end = 1 << code_size, (1 << code_size) + 1
+    out = bytearray()
+    buffer = bits = 0
+    width = code_size + 1
+
+    def emit(code):
+        nonlocal buffer, bits
+        buffer |= code << bits
+        bits += width
+        while bits >= 8:
+            out.append(buffer & 0xFF)
+            buffer >>= 8
+            bits -= 8
+
+    emit(clear)
+    table = {}
+    next_code = end + 1
+    prefix = data[0]
+    for byte in data[1:]:
+        key = prefix << 8 | byte
+        code = table.get(key)
+        if code is not None:
+            prefix = code
+            continue
+        emit(prefix)
+        if next_code < 4096:
+            table[key] = next_code
+            next_code += 1
+            # the decoder is one code behind, so it widens one code later
+            if next_code > 1 << width and width < 12:
+                width += 1
+        else:
+            emit(clear)
+            table = {}
+            next_code = end + 1
+            width = code_size + 1
+        prefix = byte
+    emit(prefix)
+    emit(end)
+    if bits:
+        out.append(buffer & 0xFF)
+
+    blocks = bytearray([code_size])
+    for i in range(0, len(out), 255):
+        chunk = out[i:i + 255]
+        blocks.append(len(chunk))
+        blocks += chunk
+    blocks.append(0)
+    return bytes(blocks)
+
+
+def gif_image(surface, rect):
+    """Palette indices of `rect` on the surface, LZW-encoded"""
+    mapped = np.array([surface.map_rgb(color) for color in GIF_PALETTE], dtype=np.uint32)
+    order = np.argsort(mapped)
+    pixels = pygame.surfarray.pixels2d(surface)[rect.left:rect.right, rect.top:rect.bottom]
+    # GIF rows run left to right, surfarray is indexed [x, y]
+    indices = order[np.searchsorted(mapped[order], pixels)].T.astype(np.uint8)
+    del pixels
+    return lzw_encode(indices.tobytes())
+
+
+class GifWriter:
+    """Streams frames into an animated GIF with one global palette"""
+
+    def __init__(self, path, size):
+        self.file = open(path, "wb")
+        width, height = size
+        self.file.write(b"GIF89a" + struct.pack("<HHBBB", width, height, 0xF0 | (GIF_CODE_SIZE - 1), 0, 0))
+        self.file.write(bytes(channel for color in GIF_PALETTE for channel in color))
+        # NETSCAPE2.0 extension: loop forever
+        self.file.write(b"\x21\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00")
+
+    def add(self, rect, image, delay_ms):
+        """Add an encoded image covering rect (x, y, w, h) on top of the previous frame"""
+        # graphic control extension: keep the previous frame underneath, delay in 1/100 s
+        self.file.write(struct.pack("<BBBBHBB", 0x21, 0xF9, 4, 1 << 2, round(delay_ms / 10), 0, 0))
+        self.file.write(struct.pack("<BHHHHB", 0x2C, *rect, 0))
+        self.file.write(image)
+
+    def close(self):
+        self.file.write(b"\x3b")
+        self.file.close()
+
+
+# per worker process: one renderer per (event log, options), kept across chunks
+_renderers = {}
+
+
+def render_frames(jobs):
+    """Worker: render (event log, frame, options) jobs; options are
+    (width, height, steps per frame, PNG file pattern or None for GIF images)"""
+    results = []
+    for log, number, options in jobs:
+        width, height, steps_per_frame, pattern = options
+        renderer = _renderers.get((log, options))
+        if renderer is None:
+            _renderers.clear()
+            renderer = FrameRenderer(*load_events(log), (width, height), steps_per_frame)
+            _renderers[(log, options)] = renderer
+        rect = renderer.draw(number)
+        if pattern is not None:
+            pygame.image.save(renderer.surface, pattern % number)
+            results.append((number, None, None))
+        else:
+            results.append((number, tuple(rect), gif_image(renderer.surface, rect)))
+    return results
+
+
+def render_log(log, output, frames=DEFAULT_FRAMES, size=None, delay=DEFAULT_DELAY_MS, workers=None, chunk_size=8):
+    """Render an event log to a PNG sequence (output is a directory) or an animated
+    GIF (output ends in .gif); returns the number of frames written"""
+    with open(log, "rb") as f:
+        cols, rows, _, _, _ = read_header(f)
+        explored = len(read_events(f, cols, rows))
+    size = size or frame_size(cols, rows)
+    steps_per_frame = max(1, -(-explored // max(1, frames - 1)))
+    last_frame = -(-explored // steps_per_frame)
+
+    gif = output.lower().endswith(".gif")
+    if gif:
+        pattern = None
+        writer = GifWriter(output, size)
+    else:
+        os.makedirs(output, exist_ok=True)
+        pattern = os.path.join(output, PNG_NAME)
+    options = (*size, steps_per_frame, pattern)
+    jobs = ((log, number, options) for number in range(last_frame + 1))
+
+    # chunks finish out of order, GIF frames are written in order
+    pending = {}
+    written = 0
+    try:
+        for number, rect, image in run_batch(jobs, workers, chunk_size, worker=render_frames):
+            if not gif:
+                written += 1
+                continue
+            pending[number] = (rect, image)
+            while written in pending:
+                rect, image = pending.pop(written)
+                writer.add(rect, image, FINAL_DELAY_MS if written == last_frame else delay)
+                written += 1
+    finally:
+        if gif:
+            writer.close()
+    return written
+
+
+def export(maze, output, solver="bfs", events=None, **options):
+    """Search `maze` headlessly and render the run with render_log; the event log is
+    kept in `events` if given. Returns (frames written, steps recorded)"""
+    explored, path, found = record_events(maze, solver)
+    if events is None:
+        handle, log = tempfile.mkstemp(suffix=".maze")
+        os.close(handle)
+    else:
+        log = events
+    try:
+        save_events(log, maze, explored, (path, found))
+        return render_log(log, output, **options), len(explored)
+    finally:
+        if events is None:
+            os.remove(log)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a solver run offline to PNG frames or a GIF")
+    parser.add_argument("output", help="directory for a PNG sequence, or a .gif file")
+    parser.add_argument("--size", type=int, default=100, help="side length of the maze")
+    parser.add_argument("--generator", default="dfs")
+    parser.add_argument("--seed", type=seed_arg)
+    parser.add_argument("--load", metavar="FILE", help="export a saved maze instead of generating one")
+    parser.add_argument("--solver", default="bfs")
+    parser.add_argument("--events", metavar="FILE", help="keep the recorded event log in this file")
+    parser.add_argument("--replay", metavar="FILE", help="render a saved event log instead of searching")
+    parser.add_argument("--frames", type=int, default=DEFAULT_FRAMES, help="number of frames, at most")
+    parser.add_argument("--width", type=int, help="frame width (default: the interactive window's)")
+    parser.add_argument("--height", type=int, help="frame height (default: the interactive window's)")
+    parser.add_argument("--delay", type=int, default=DEFAULT_DELAY_MS, help="GIF milliseconds per frame")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per core)")
+    parser.add_argument("--chunk-size", type=int, default=8, help="consecutive frames per task sent to a worker")
+    args = parser.parse_args()
+
+    options = {"frames": args.frames, "delay": args.delay, "workers": args.workers, "chunk_size": args.chunk_size}
+    if args.width or args.height:
+        options["size"] = (args.width or DEFAULT_WIDTH, args.height or DEFAULT_HEIGHT)
+    start = time.perf_counter()
+    if args.replay:
+        frames = render_log(args.replay, args.output, **options)
+        summary = f"{frames} frames"
+    else:
+        maze = Maze.load(args.load) if args.load else Maze(args.size, args.size, args.generator, args.seed)
+        frames, steps = export(maze, args.output, args.solver, args.events, **options)
+        summary = f"{frames} frames of {steps} steps"
+    elapsed = time.perf_counter() - start
+    print(f"{summary} written to {args.output} in {elapsed:.2f} s, {frames / elapsed:.1f} frames/s "
+          f"on {args.workers or os.cpu_count()} worker(s)")
+
+
+if __name__ == "__main__":
+    main()
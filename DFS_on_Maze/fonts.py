@@ -0,0 +1,28 @@
+import pygame
+from config import FONT_FAMILY
+
+#    ╔══════════════════════════════════════════════════════════════════════╗
+#    ║  pygame.font.SysFont scans the installed fonts on every call, so     ║
+#    ║  fonts are created on first use and cached by family and size.       ║
+#    ║  A Font must not outlive the font module: using one after            ║
+#    ║  pygame.quit() crashes the interpreter, so the cache is emptied      ║
+#    ║  whenever pygame (or pygame.font) shuts down.                        ║
+#    ╚══════════════════════════════════════════════════════════════════════╝
+
+# (size, family) -> Font, valid until the font module is shut down
+_fonts = {}
+
+
+def get_font(size, family=FONT_FAMILY):
+    """Shared Font for (size, family), initializing pygame.font if needed"""
+    if not pygame.font.get_init():
+        # pygame.font.quit() alone runs no quit hooks
+        _fonts.clear()
+        pygame.font.init()
+    font = _fonts.get((size, family))
+    if font is None:
+        if not _fonts:
+            # pygame.quit() forgets its hooks once it has run them
+            pygame.register_quit(_fonts.clear)
+        font = _fonts[(size, family)] = pygame.font.SysFont(family, size)
+    return font
@@ -0,0 +1,317 @@
+from array import array
+
+from maze import ALL_WALLS, BOTTOM, LEFT, OPPOSITE, RIGHT, TOP
+
+#    ╔══════════════════════════════════════════════════════════════════════╗
+#    ║                        Generator registry                            ║
+#    ║                                                                      ║
+#    ║  Every generator has the signature                                   ║
+#    ║                                                                      ║
+#    ║      generator(cols, rows, rng) -> bytearray of packed wall masks    ║
+#    ║                                                                      ║
+#    ║  and draws all its randomness from `rng` (a random.Random), so the   ║
+#    ║  same seed always produces the same maze. All of them build perfect  ║
+#    ║  mazes (exactly one path between any two cells).                     ║
+#    ║                                                                      ║
+#    ║  braid() then turns a perfect maze into one with loops by opening    ║
+#    ║  dead ends, and terrain_costs() draws per-cell traversal costs;      ║
+#    ║  Maze applies both after the generator, from the same rng.           ║
+#    ╚══════════════════════════════════════════════════════════════════════╝
+
+def recursive_backtracker(cols, rows, rng):
+    """Randomized DFS: long winding corridors, few dead ends"""
+    size = cols * rows
+    walls = bytearray([ALL_WALLS]) * size
+    visited = bytearray(size)
+
+    current = 0
+    visited[current] = 1
+    array = []
+    break_count = 1
+
+    while break_count != size:
+        x, y = current % cols, current // cols
+        neighbors = []
+        if y > 0 and not visited[current - cols]:
+            neighbors.append((current - cols, TOP))
+        if x < cols - 1 and not visited[current + 1]:
+            neighbors.append((current + 1, RIGHT))
+        if y < rows - 1 and not visited[current + cols]:
+            neighbors.append((current + cols, BOTTOM))
+        if x > 0 and not visited[current - 1]:
+            neighbors.append((current - 1, LEFT))
+        if neighbors:
+            next_index, side = rng.choice(neighbors)
+            visited[next_index] = 1
+            break_count += 1
+            array.append(current)
+            walls[current] &= ~side
+            walls[next_index] &= ~OPPOSITE[side]
+            current = next_index
+        elif array:
+            current = array.pop()
+
+    return walls
+
+
+def kruskal(cols, rows, rng):
+    """Randomized Kruskal: shuffled edges joined through a union-find forest"""
+    size = cols * rows
+    walls = bytearray([ALL_WALLS]) * size
+    parent = array("i", range(size))
+
+    # even edge ids are a cell's right wall, odd ones its bottom wall
+    edges = [i * 2 for i in range(size) if i % cols != cols - 1]
+    edges += [i * 2 + 1 for i in range(size - cols)]
+    rng.shuffle(edges)
+
+    remaining = size - 1
+    for edge in edges:
+        if not remaining:
+            break
+        cell = edge >> 1
+        neighbor = cell + cols if edge & 1 else cell + 1
+
+        root_a = cell
+        while parent[root_a] != root_a:
+            parent[root_a] = parent[parent[root_a]]
+            root_a = parent[root_a]
+        root_b = neighbor
+        while parent[root_b] != root_b:
+            parent[root_b] = parent[parent[root_b]]
+            root_b = parent[root_b]
+        if root_a == root_b:
+            continue
+
+        parent[root_b] = root_a
+        if edge & 1:
+            walls[cell] &= ~BOTTOM
+            walls[neighbor] &= ~TOP
+        else:
+            walls[cell] &= ~RIGHT
+            walls[neighbor] &= ~LEFT
+        remaining -= 1
+
+    return walls
+
+
+def prim(cols, rows, rng):
+    """Randomized Prim: grows the maze from random frontier edges, many short dead ends"""
+    size = cols * rows
+    walls = bytearray([ALL_WALLS]) * size
+    in_maze = bytearray(size)
+    frontier = []
+
+    def add_edges(cell):
+        x, y = cell % cols, cell // cols
+        if y > 0 and not in_maze[cell - cols]:
+            frontier.append((cell, TOP))
+        if x < cols - 1 and not in_maze[cell + 1]:
+            frontier.append((cell, RIGHT))
+        if y < rows - 1 and not in_maze[cell + cols]:
+            frontier.append((cell, BOTTOM))
+        if x > 0 and not in_maze[cell - 1]:
+            frontier.append((cell, LEFT))
+
+    deltas = {TOP: -cols, RIGHT: 1, BOTTOM: cols, LEFT: -1}
+    start = rng.randrange(size)
+    in_maze[start] = 1
+    add_edges(start)
+
+    while frontier:
+        # swap-remove a random frontier edge
+        pick = rng.randrange(len(frontier))
+        frontier[pick], frontier[-1] = frontier[-1], frontier[pick]
+        cell, side = frontier.pop()
+        neighbor = cell + deltas[side]
+        if in_maze[neighbor]:
+            continue
+        in_maze[neighbor] = 1
+        walls[cell] &= ~side
+        walls[neighbor] &= ~OPPOSITE[side]
+        add_edges(neighbor)
+
+    return walls
+
+
+def eller_rows(cols, rows, rng):
+    """Eller's algorithm, yielding one finished row of wall masks at a time.
+
+    Only the current row's set labels are kept, so memory is O(cols) no
+    matter how many rows are generated.
+    """
+    labels = list(range(cols))
+    for y in range(rows):
+        last_row = y == rows - 1
+        row = bytearray([ALL_WALLS]) * cols
+        if y > 0:
+            for x in range(cols):
+                if carried[x]:
+                    row[x] &= ~TOP
+
+        # union-find over this row's labels, which are always in range(cols)
+        parent = list(range(cols))
+
+        def find(label):
+            while parent[label] != label:
+                parent[label] = parent[parent[label]]
+                label = parent[label]
+            return label
+
+        # join horizontal neighbors from different sets
+        for x in range(cols - 1):
+            a, b = find(labels[x]), find(labels[x + 1])
+            if a != b and (last_row or rng.random() < 0.5):
+                parent[b] = a
+                row[x] &= ~RIGHT
+                row[x + 1] &= ~LEFT
+
+        if last_row:
+            yield row
+            return
+
+        # every set carves at least one passage down into the next row
+        members = {}
+        for x in range(cols):
+            members.setdefault(find(labels[x]), []).append(x)
+        carried = bytearray(cols)
+        next_labels = [-1] * cols
+        for root, cells in members.items():
+            down = [x for x in cells if rng.random() < 0.5] or [rng.choice(cells)]
+            for x in down:
+                carried[x] = 1
+                row[x] &= ~BOTTOM
+                next_labels[x] = root
+
+        # cells not carried down start new sets with unused labels
+        unused = iter(sorted(set(range(cols)) - members.keys()))
+        labels = [label if label != -1 else next(unused) for label in next_labels]
+        yield row
+
+
+def eller(cols, rows, rng):
+    """Eller's algorithm: builds the maze one row at a time"""
+    walls = bytearray()
+    for row in eller_rows(cols, rows, rng):
+        walls += row
+    return walls
+
+
+def binary_tree(cols, rows, rng):
+    """Binary tree: every cell opens north or west, strongly biased diagonal corridors"""
+    walls = bytearray([ALL_WALLS]) * (cols * rows)
+    for y in range(rows):
+        for x in range(cols):
+            cell = x + y * cols
+            if y > 0 and (x == 0 or rng.random() < 0.5):
+                walls[cell] &= ~TOP
+                walls[cell - cols] &= ~BOTTOM
+            elif x > 0:
+                walls[cell] &= ~LEFT
+                walls[cell - 1] &= ~RIGHT
+    return walls
+
+
+def wilson(cols, rows, rng):
+    """Wilson's algorithm: loop-erased random walks, a uniform spanning tree"""
+    size = cols * rows
+    walls = bytearray([ALL_WALLS]) * size
+    in_maze = bytearray(size)
+    # direction of the last exit from each cell during the current walk
+    exits = bytearray(size)
+    deltas = {TOP: -cols, RIGHT: 1, BOTTOM: cols, LEFT: -1}
+    in_maze[rng.randrange(size)] = 1
+
+    for start in range(size):
+        if in_maze[start]:
+            continue
+        cell = start
+        while not in_maze[cell]:
+            x, y = cell % cols, cell // cols
+            options = []
+            if y > 0:
+                options.append(TOP)
+            if x < cols - 1:
+                options.append(RIGHT)
+            if y < rows - 1:
+                options.append(BOTTOM)
+            if x > 0:
+                options.append(LEFT)
+            side = rng.choice(options)
+            exits[cell] = side
+            cell += deltas[side]
+
+        # retrace the walk; overwritten exits have already erased its loops
+        cell = start
+        while not in_maze[cell]:
+            side = exits[cell]
+            neighbor = cell + deltas[side]
+            in_maze[cell] = 1
+            walls[cell] &= ~side
+            walls[neighbor] &= ~OPPOSITE[side]
+            cell = neighbor
+
+    return walls
+
+
+GENERATORS = {
+    "dfs": recursive_backtracker,
+    "kruskal": kruskal,
+    "prim": prim,
+    "eller": eller,
+    "binary_tree": binary_tree,
+    "wilson": wilson,
+}
+
+# generators that can also emit finished rows one at a time (see mazefile.write_maze)
+ROW_GENERATORS = {
+    "eller": eller_rows,
+}
+
+
+def get_generator(name):
+    """Look up a generator in the registry by name"""
+    try:
+        return GENERATORS[name]
+    except KeyError:
+        raise ValueError(
+            f"unknown generator {name!r}, expected one of: {', '.join(GENERATORS)}"
+        ) from None
+
+
+# number of walls in every wall mask; 3 walls make a dead end
+WALL_COUNT = bytes(bin(mask).count("1") for mask in range(16))
+
+
+def braid(walls, cols, rows, rng, fraction=1.0):
+    """Open one more wall of about `fraction` of the dead ends, in place, adding loops.
+
+    A dead end is joined to a neighboring dead end when it has one, so that
+    one opening removes two of them. Returns `walls`.
+    """
+    deltas = {TOP: -cols, RIGHT: 1, BOTTOM: cols, LEFT: -1}
+    dead_ends = [i for i, mask in enumerate(walls) if WALL_COUNT[mask] == 3]
+    rng.shuffle(dead_ends)
+    for cell in dead_ends[:round(len(dead_ends) * fraction)]:
+        # an earlier opening may already have joined this one
+        if WALL_COUNT[walls[cell]] != 3:
+            continue
+        x, y = cell % cols, cell // cols
+        sides = [
+            side for side, inside in ((TOP, y > 0), (RIGHT, x < cols - 1), (BOTTOM, y < rows - 1), (LEFT, x > 0))
+            if inside and walls[cell] & side
+        ]
+        if not sides:
+            continue
+        dead_neighbors = [side for side in sides if WALL_COUNT[walls[cell + deltas[side]]] == 3]
+        side = rng.choice(dead_neighbors or sides)
+        walls[cell] &= ~side
+        walls[cell + deltas[side]] &= ~OPPOSITE[side]
+    return walls
+
+
+def terrain_costs(cols, rows, rng, max_cost):
+    """Cost of entering every cell, drawn uniformly from 1..max_cost, one byte per cell"""
+    if not 1 <= max_cost <= 255:
+        raise ValueError(f"max_cost must be between 1 and 255, got {max_cost}")
+    return bytearray(rng.choices(range(1, max_cost + 1), k=cols * rows))
@@ -0,0 +1,146 @@
+import cProfile
+import json
+import pstats
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+#    ╔══════════════════════════════════════════════════════════════════════╗
+#    ║  Named timers and counters for the hot paths.                        ║
+#    ║                                                                      ║
+#    ║      with instruments.timer("search"): ...                           ║
+#    ║      @instruments.timed("draw.draw_maze")                            ║
+#    ║      instruments.count("search.steps", len(cells))                   ║
+#    ║                                                                      ║
+#    ║  Everything is off until instruments.enable(); disabled timers are   ║
+#    ║  one shared no-op context manager and timed functions cost a single  ║
+#    ║  flag check. Timers nest: a phase's time includes the phases run     ║
+#    ║  inside it.                                                          ║
+#    ╚══════════════════════════════════════════════════════════════════════╝
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ("instruments", "name", "start")
+
+    def __init__(self, instruments, name):
+        self.instruments = instruments
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.instruments.add_time(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Instruments:
+    def __init__(self):
+        self.enabled = False
+        self.reset()
+
+    def enable(self, enabled=True):
+        self.enabled = enabled
+
+    def reset(self):
+        # name -> [total seconds, calls]
+        self.timers = {}
+        self.counters = {}
+        self.started = time.perf_counter()
+
+    def timer(self, name):
+        return _Timer(self, name) if self.enabled else NULL_TIMER
+
+    def timed(self, name):
+        """Decorator timing every call of a function under `name`"""
+        def decorate(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.add_time(name, time.perf_counter() - start)
+            return wrapper
+        return decorate
+
+    def add_time(self, name, seconds):
+        entry = self.timers.get(name)
+        if entry is None:
+            self.timers[name] = [seconds, 1]
+        else:
+            entry[0] += seconds
+            entry[1] += 1
+
+    def count(self, name, amount=1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def report(self):
+        """Per-phase breakdown as a JSON-ready dict"""
+        wall = time.perf_counter() - self.started
+        return {
+            "wall_s": wall,
+            "timers": {
+                name: {
+                    "total_s": total,
+                    "calls": calls,
+                    "mean_ms": total / calls * 1000,
+                    "share": total / wall if wall else 0,
+                }
+                for name, (total, calls) in sorted(self.timers.items(), key=lambda item: -item[1][0])
+            },
+            "counters": dict(sorted(self.counters.items())),
+        }
+
+    def write_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=2)
+
+    def table(self):
+        """Per-phase breakdown as a console table"""
+        report = self.report()
+        lines = [
+            f"{'phase':<24} | {'total (s)':>9} | {'calls':>8} | {'mean (ms)':>9} | {'share':>6}",
+            "-" * 68,
+        ]
+        for name, entry in report["timers"].items():
+            lines.append(
+                f"{name:<24} | {entry['total_s']:>9.3f} | {entry['calls']:>8} | "
+                f"{entry['mean_ms']:>9.3f} | {entry['share']:>6.1%}"
+            )
+        lines.append(f"{'wall':<24} | {report['wall_s']:>9.3f} |")
+        for name, value in report["counters"].items():
+            lines.append(f"{name:<24} | {value:>9}")
+        return "\n".join(lines)
+
+
+instruments = Instruments()
+
+
+@contextmanager
+def profiled(path=None, top=20):
+    """Run the block under cProfile; dump the stats to `path` and print the top entries"""
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield profile
+    finally:
+        profile.disable()
+        if path:
+            profile.dump_stats(path)
+        pstats.Stats(profile).sort_stats("cumulative").print_stats(top)
@@ -0,0 +1,93 @@
+from array import array
+
+#    ╔══════════════════════════════════════════════════════════════════════╗
+#    ║  Corridor contraction.                                               ║
+#    ║                                                                      ║
+#    ║  Most cells of a perfect maze have exactly two open sides and only   ║
+#    ║  lead on to the next cell. JunctionGraph keeps the other cells       ║
+#    ║  (junctions and dead ends) plus start and goal as nodes, and turns   ║
+#    ║  every corridor between two of them into one edge weighted by its    ║
+#    ║  length in steps (or the costs of its cells, when the maze has       ║
+#    ║  them). Edges are stored CSR-style: the edges of node n are          ║
+#    ║  offsets[n] .. offsets[n + 1] in targets/weights/first_steps.        ║
+#    ║  Only the final answer is expanded back into cells, by re-walking    ║
+#    ║  its corridors from their first step.                                ║
+#    ╚══════════════════════════════════════════════════════════════════════╝
+
+
+class JunctionGraph:
+    """Weighted graph of a maze's junctions, dead ends and kept cells"""
+
+    def __init__(self, maze, keep=()):
+        self.maze = maze
+        walls, deltas, costs = maze.walls, maze.deltas, maze.costs
+        size = len(walls)
+
+        # node number of every cell, -1 inside corridors
+        node_of = maze.new_indices()
+        cells = array("i")
+        keep = {maze.index(*cell) for cell in keep}
+        for i in range(size):
+            if len(deltas[walls[i]]) != 2 or i in keep:
+                node_of[i] = len(cells)
+                cells.append(i)
+
+        offsets = array("i", [0])
+        targets, weights, first_steps = array("i"), array("i"), array("i")
+        for i in cells:
+            for delta in deltas[walls[i]]:
+                previous, current = i, i + delta
+                weight = costs[current] if costs is not None else 1
+                while node_of[current] == -1:
+                    a, b = deltas[walls[current]]
+                    previous, current = current, current + (a if current + a != previous else b)
+                    weight += costs[current] if costs is not None else 1
+                targets.append(node_of[current])
+                weights.append(weight)
+                first_steps.append(delta)
+            offsets.append(len(targets))
+
+        self.node_of = node_of
+        self.cells = cells
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.first_steps = first_steps
+
+    @property
+    def node_count(self):
+        return len(self.cells)
+
+    @property
+    def edge_count(self):
+        """Undirected edges; every corridor is stored once from each end"""
+        return len(self.targets) // 2
+
+    @property
+    def compression(self):
+        """Maze cells per graph node"""
+        return len(self.maze.walls) / max(1, len(self.cells))
+
+    def node(self, index):
+        """Node number of a cell index, or -1 if the cell is inside a corridor"""
+        return self.node_of[index]
+
+    def corridor(self, node, edge):
+        """Cell indices along `edge` of `node`, excluding the node and including the far end"""
+        walls, deltas, node_of = self.maze.walls, self.maze.deltas, self.node_of
+        previous = self.cells[node]
+        current = previous + self.first_steps[edge]
+        cells = [current]
+        while node_of[current] == -1:
+            a, b = deltas[walls[current]]
+            previous, current = current, current + (a if current + a != previous else b)
+            cells.append(current)
+        return cells
+
+    def expand(self, nodes, edges):
+        """Cell path (as (x, y)) through `nodes`, where edges[k] leads from nodes[k] to nodes[k + 1]"""
+        cols = self.maze.cols
+        indices = [self.cells[nodes[0]]]
+        for node, edge in zip(nodes, edges):
+            indices.extend(self.corridor(node, edge))
+        return [(i % cols, i // cols) for i in indices]
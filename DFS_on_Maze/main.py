@@ -1,87 +1,260 @@
+import argparse
 import time
+from collections import deque
+from contextlib import nullcontext
+
 import pygame
 
 from colors import BLACK, GRAY
-from config import DEFAULT_HEIGHT, DEFAULT_WIDTH, FPS, SOLVING_SPEED
-from draw import Drawing
+from config import (
+    DEFAULT_HEIGHT, DEFAULT_WIDTH, FPS, MAX_STEPS_PER_SECOND, MIN_STEPS_PER_SECOND,
+    SOLVING_SPEED, STEP_BUDGET,
+)
+from draw import make_drawing
 from maze import Maze
-from ui import get_maze_dimensions, setup_display
+from mazefile import MazeCache, seed_arg
+from generators import GENERATORS
+from instrument import instruments, profiled
+from solver import SOLVERS
+from ui import fit_tile_size, get_maze_dimensions, setup_display
 
 #      ╔══════════════════════╗
 #      ║        main()        ║
 #      ╚══════════════════════╝
 
-def main():
-    global SOLVING_SPEED
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Maze generator and solver")
+    parser.add_argument(
+        "--solver", choices=list(SOLVERS), default="dfs",
+        help="solver preselected on the start screen (default: dfs)",
+    )
+    parser.add_argument(
+        "--generator", choices=list(GENERATORS), default="dfs",
+        help="maze generation algorithm (default: dfs)",
+    )
+    parser.add_argument("--seed", type=seed_arg, help="seed for a reproducible maze")
+    parser.add_argument(
+        "--braid", type=float, default=0.0, metavar="FRACTION",
+        help="open this fraction of the dead ends into loops (default: 0, a perfect maze)",
+    )
+    parser.add_argument(
+        "--max-cost", type=int, default=1,
+        help="give every cell a random traversal cost from 1 to this (default: 1, unweighted)",
+    )
+    parser.add_argument(
+        "--cache", action="store_true",
+        help="serve the maze from the on-disk cache keyed by size, generator and seed",
+    )
+    parser.add_argument("--load", metavar="FILE", help="replay a saved maze, skipping the start screen")
+    parser.add_argument("--save", metavar="FILE", help="save the maze and its solved path after solving")
+    parser.add_argument("--overlay", action="store_true", help="show frame time and steps/s (toggle with F3)")
+    parser.add_argument(
+        "--instrument", metavar="FILE",
+        help="time generation, search and drawing; print a breakdown and write it as JSON",
+    )
+    parser.add_argument("--profile", metavar="FILE", help="run under cProfile and dump the stats")
+    return parser.parse_args(argv)
+
+PAN_KEYS = {
+    pygame.K_LEFT: (-1, 0),
+    pygame.K_RIGHT: (1, 0),
+    pygame.K_UP: (0, -1),
+    pygame.K_DOWN: (0, 1),
+}
+
+def print_stats(maze, solver, cols, rows):
+    total_cells = cols * rows
+    maze_coverage = (len(maze.explored_cells) / total_cells) * 100
+
+    print("\n╔════════════════════════════════════╗")
+    print("║        Statistics for this run     ║")
+    print("╚════════════════════════════════════╝\n")
+    print(f"Generator: {maze.generator} (seed {maze.seed})")
+    print(f"Solver: {solver}")
+    print(f"Total Maze Cells: {total_cells}")
+    print(f"Nodes Visited: {maze.stats.get('nodes_visited', 0)}")
+    print(f"Maze Coverage: {maze_coverage:.2f}%")
+    if maze.costs is not None:
+        print(f"Path Cost: {maze.path_cost(maze.correct_path)}")
+    # time spent searching, without the animation's waits between frames
+    print(f"Execution Time: {maze.stats.get('solve_time', 0):.2f} secs")
+
+def show_status(solver, steps_per_second, paused, search):
+    state = "done" if search.done else "paused" if paused else f"{steps_per_second:g} steps/s"
+    pygame.display.set_caption(f"Maze Visualization - {solver} - {state}")
+
+class FrameMeter:
+    """Frame time and solver steps per second over the last second"""
+
+    def __init__(self):
+        self.frames = deque()
+        self.last = time.perf_counter()
+
+    def tick(self, steps):
+        now = time.perf_counter()
+        self.frames.append((now, now - self.last, steps))
+        self.last = now
+        while self.frames[0][0] < now - 1:
+            self.frames.popleft()
+
+    def lines(self):
+        elapsed = max(self.frames[-1][0] - self.frames[0][0], 1e-9) if len(self.frames) > 1 else 1
+        frame_ms = sum(frame for _, frame, _ in self.frames) / len(self.frames) * 1000
+        # the oldest frame's steps happened before the window being measured
+        steps = sum(steps for _, _, steps in self.frames) - self.frames[0][2]
+        return [f"frame {frame_ms:5.1f} ms", f"{steps / elapsed:,.0f} steps/s"]
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.instrument:
+        instruments.reset()
+        instruments.enable()
+    with profiled(args.profile) if args.profile else nullcontext():
+        run(args)
+    if args.instrument:
+        print()
+        print(instruments.table())
+        instruments.write_json(args.instrument)
+
+def run(args):
     pygame.init()
     # Initially create a screen for the input dialog.
     screen = pygame.display.set_mode((DEFAULT_WIDTH, DEFAULT_HEIGHT))
     pygame.display.set_caption("Maze Visualization")
 
-    cols, rows = get_maze_dimensions(screen)
-    if cols is None or rows is None:
-        return
+    if args.load:
+        maze = Maze.load(args.load)
+        cols, rows, solver, speed = maze.cols, maze.rows, args.solver, SOLVING_SPEED
+    else:
+        cols, rows, solver, speed = get_maze_dimensions(screen, args.solver)
+        if cols is None or rows is None:
+            return
+        if args.cache:
+            seed = args.seed if args.seed is not None else 0
+            maze = MazeCache().get(cols, rows, args.generator, seed, args.braid, args.max_cost)
+        else:
+            maze = Maze(cols, rows, args.generator, args.seed, braid=args.braid, max_cost=args.max_cost)
 
-    screen = setup_display(cols, rows)
-    drawer = Drawing(screen)
-    maze = Maze(cols, rows)
+    tile_size = fit_tile_size(cols, rows)
+    screen = setup_display(cols, rows, tile_size)
+    drawer = make_drawing(screen, cols, rows, tile_size)
     clock_main = pygame.time.Clock()
     running = True
-    solve_maze = False
-    dfs_step = False
+    search = None
+    # the start screen's speed is a delay per step; the loop runs whole frames
+    steps_per_second = 1000 / speed
+    step_credit = 0.0
+    paused = False
+    single_step = False
+    to_completion = False
+    overlay = args.overlay
+    # only the viewport renderer used for large mazes has a camera
+    camera = getattr(drawer, "camera", None)
+    drag = None
+    meter = FrameMeter()
 
-    drawer.draw_maze(maze.grid_cells, cols, rows)
+    drawer.draw_maze(maze.grid_cells, cols, rows, path=maze.correct_path)
+    drawer.draw_info_text("Press Return to Solve the Maze")
     pygame.display.flip()
 
     while running:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
+            if camera is not None:
+                if event.type == pygame.MOUSEWHEEL:
+                    camera.zoom(event.y, pygame.mouse.get_pos())
+                elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                    drag = (event.pos, camera.x, camera.y)
+                elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+                    drag = None
+                elif event.type == pygame.MOUSEMOTION and drag is not None:
+                    (start_x, start_y), x, y = drag
+                    camera.move_to(
+                        x - (event.pos[0] - start_x) * camera.step / camera.tile,
+                        y - (event.pos[1] - start_y) * camera.step / camera.tile,
+                    )
             if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_RETURN:
-                    solve_maze = True
+                if event.key == pygame.K_RETURN and search is None:
+                    search = maze.search(solver)
+                    maze.correct_path = []
+                    # the info box is not part of the maze state, repaint over it
+                    drawer.invalidate()
+                elif camera is not None and event.mod & pygame.KMOD_SHIFT and event.key in PAN_KEYS:
+                    # Shift+arrows scroll a quarter of the window
+                    dx, dy = PAN_KEYS[event.key]
+                    camera.pan(dx * camera.width // 4, dy * camera.height // 4)
+                elif camera is not None and event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+                    camera.zoom(1)
+                elif camera is not None and event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                    camera.zoom(-1)
+                elif camera is not None and event.key == pygame.K_0:
+                    camera.fit()
                 elif event.key == pygame.K_UP:
-                    SOLVING_SPEED = max(5, SOLVING_SPEED - 5)
+                    steps_per_second = min(MAX_STEPS_PER_SECOND, steps_per_second * 2)
                 elif event.key == pygame.K_DOWN:
-                    SOLVING_SPEED = min(500, SOLVING_SPEED + 5)
-
-        if solve_maze and not dfs_step:
-            attempted_path, found_solution = maze.run_dfs(
-                screen,
-                drawer.draw_maze,
-                clock_main,
-                SOLVING_SPEED,
-            )
-            maze.correct_path = attempted_path
-            dfs_step = True
-
-            total_cells = cols * rows
-            maze_coverage = (len(maze.explored_cells) / total_cells) * 100
-
-            print("\n╔════════════════════════════════════╗")
-            print("║        Statistics for this run     ║")
-            print("╚════════════════════════════════════╝\n")
-            print(f"Total Maze Cells: {total_cells}")
-            print(f"Nodes Visited: {maze.stats.get('nodes_visited', 0)}")
-            print(f"Maze Coverage: {maze_coverage:.2f}%")
-            print(f"Execution Time: {maze.stats.get('end_time', time.time()) - maze.stats.get('start_time', time.time()):.2f} secs")
-
-        drawer.draw_maze(
+                    steps_per_second = max(MIN_STEPS_PER_SECOND, steps_per_second / 2)
+                elif event.key == pygame.K_SPACE:
+                    paused = not paused
+                elif event.key in (pygame.K_RIGHT, pygame.K_s):
+                    paused = single_step = True
+                elif event.key in (pygame.K_END, pygame.K_c):
+                    to_completion = True
+                    paused = False
+                elif event.key == pygame.K_F3:
+                    overlay = not overlay
+                    # repaint the maze where the overlay was
+                    drawer.invalidate()
+
+        explored_now = None
+        if search is not None and not search.done:
+            if to_completion:
+                count = None
+            elif single_step:
+                count = 1
+            elif paused:
+                count = 0
+            else:
+                step_credit += steps_per_second / FPS
+                count = int(step_credit)
+                step_credit -= count
+            single_step = False
+
+            if count != 0:
+                explored_now = search.step(count, budget=STEP_BUDGET / FPS)
+                if search.done:
+                    maze.correct_path = search.path
+                    print_stats(maze, solver, cols, rows)
+                    if args.save:
+                        maze.save(args.save)
+                        print(f"Saved maze and path to {args.save}")
+            show_status(solver, steps_per_second, paused, search)
+
+        dirty = drawer.draw_maze(
             maze.grid_cells,
             cols,
             rows,
             maze.explored_cells,
             maze.correct_path,
             failed=(
-                dfs_step and maze.correct_path and maze.correct_path[-1] != (cols - 1, rows - 1)
+                search is not None and search.done
+                and maze.correct_path and maze.correct_path[-1] != (cols - 1, rows - 1)
             ),
+            changed=explored_now,
         )
 
-        if not solve_maze:
-            drawer.draw_info_text("Press Return to Solve the Maze")
+        if search is None and dirty:
+            dirty.append(drawer.draw_info_text("Press Return to Solve the Maze"))
+
+        meter.tick(len(explored_now) if explored_now else 0)
+        if overlay:
+            dirty.append(drawer.draw_overlay(meter.lines()))
 
-        pygame.display.flip()
-        clock_main.tick(FPS)
+        if dirty:
+            with instruments.timer("display.update"):
+                pygame.display.update(dirty)
+        with instruments.timer("frame.wait"):
+            clock_main.tick(FPS)
 
     pygame.quit()
 
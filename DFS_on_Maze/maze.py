@@ -1,16 +1,122 @@
-from random import choice
+from array import array
+from random import Random, choice, randrange
+
+from instrument import instruments
+from solver import SolverRun, get_solver
 
 #    ╔══════════════════════════════════════════════════════════════════════╗
-#    ║  Defines a maze with cell management, wall removal, and DFS-based    ║
-#    ║  maze generation for constructing a perfect labyrinth.               ║
+#    ║  Defines a maze with cell management, wall removal, and seeded       ║
+#    ║  generation (see generators.py) for constructing a perfect           ║
+#    ║  labyrinth, optionally braided into one with loops and given         ║
+#    ║  per-cell traversal costs (`costs`, one byte per cell, or None when  ║
+#    ║  every step costs 1).                                                ║
+#    ║                                                                      ║
+#    ║  Walls are stored as a packed 4-bit mask per cell in one bytearray;  ║
+#    ║  Cell objects are thin views created on demand over that array.      ║
+#    ║  The mask doubles as the adjacency index: `deltas[walls[i]]` lists   ║
+#    ║  the offsets from i to every neighbor reachable from it.             ║
 #    ╚══════════════════════════════════════════════════════════════════════╝
 
+# wall bits
+TOP = 1
+RIGHT = 2
+BOTTOM = 4
+LEFT = 8
+ALL_WALLS = TOP | RIGHT | BOTTOM | LEFT
+
+WALL_BITS = {"top": TOP, "right": RIGHT, "bottom": BOTTOM, "left": LEFT}
+OPPOSITE = {TOP: BOTTOM, RIGHT: LEFT, BOTTOM: TOP, LEFT: RIGHT}
+DIRECTIONS = (TOP, RIGHT, BOTTOM, LEFT)
+
+
+def neighbor_deltas(cols):
+    """For every 4-bit wall mask, the index offsets of its open sides"""
+    offsets = ((TOP, -cols), (RIGHT, 1), (BOTTOM, cols), (LEFT, -1))
+    return tuple(
+        tuple(delta for side, delta in offsets if not mask & side)
+        for mask in range(ALL_WALLS + 1)
+    )
+
+
+class CellWalls:
+    """Dict-like view of one cell's wall bits ("top", "right", ...)"""
+
+    __slots__ = ("maze", "index")
+
+    def __init__(self, maze, index):
+        self.maze = maze
+        self.index = index
+
+    def __getitem__(self, side):
+        return bool(self.maze.walls[self.index] & WALL_BITS[side])
+
+    def __setitem__(self, side, value):
+        if value:
+            self.maze.walls[self.index] |= WALL_BITS[side]
+        else:
+            self.maze.walls[self.index] &= ~WALL_BITS[side]
+
+    def get(self, side, default=None):
+        return self[side] if side in WALL_BITS else default
+
+    def keys(self):
+        return WALL_BITS.keys()
+
+    def items(self):
+        return [(side, self[side]) for side in WALL_BITS]
+
+    def __iter__(self):
+        return iter(WALL_BITS)
+
+    def __len__(self):
+        return len(WALL_BITS)
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+
 class Cell:
-    def __init__(self, x, y, cols, rows):
-        self.x, self.y = x, y
-        self.cols, self.rows = cols, rows
-        self.walls = {"top": True, "right": True, "bottom": True, "left": True}
-        self.visited = False
+    """Lazy view of a single maze tile, backed by the maze's wall array"""
+
+    __slots__ = ("maze", "index", "x", "y")
+
+    def __init__(self, maze, index):
+        self.maze = maze
+        self.index = index
+        self.y, self.x = divmod(index, maze.cols)
+
+    @property
+    def cols(self):
+        return self.maze.cols
+
+    @property
+    def rows(self):
+        return self.maze.rows
+
+    @property
+    def walls(self):
+        return CellWalls(self.maze, self.index)
+
+    @property
+    def visited(self):
+        return bool(self.maze.visited[self.index])
+
+    @visited.setter
+    def visited(self, value):
+        self.maze.visited[self.index] = 1 if value else 0
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, Cell)
+            and self.maze is other.maze
+            and self.index == other.index
+        )
+
+    def __hash__(self):
+        return hash((id(self.maze), self.index))
+
+    def __repr__(self):
+        return f"Cell({self.x}, {self.y})"
 
     def check_cell(self, x, y, grid_cells):
         if x < 0 or x > self.cols - 1 or y < 0 or y > self.rows - 1:
@@ -35,65 +141,206 @@ class Cell:
 
     # retrieve neighbors
     def get_neighbors(self, grid_cells):
-        neighbors = []
-        if not self.walls["top"]:
-            neighbors.append(self.check_cell(self.x, self.y - 1, grid_cells))
-        if not self.walls["right"]:
-            neighbors.append(self.check_cell(self.x + 1, self.y, grid_cells))
-        if not self.walls["bottom"]:
-            neighbors.append(self.check_cell(self.x, self.y + 1, grid_cells))
-        if not self.walls["left"]:
-            neighbors.append(self.check_cell(self.x - 1, self.y, grid_cells))
-        return [n for n in neighbors if n]  # Return only valid neighbors
+        return [grid_cells[n] for n in self.maze.open_neighbors(self.index)]
 
     # check for path between 2 cells
     def is_path_between(self, other):
-        dx, dy = self.x - other.x, self.y - other.y
-        return (
-            (dx == 1 and not self.walls["left"] and not other.walls["right"]) or
-            (dx == -1 and not self.walls["right"] and not other.walls["left"]) or
-            (dy == 1 and not self.walls["top"] and not other.walls["bottom"]) or
-            (dy == -1 and not self.walls["bottom"] and not other.walls["top"])
-        )
+        return other.index - self.index in self.maze.deltas[self.maze.walls[self.index]]
+
+
+class GridCells:
+    """Sequence of Cell views; cells are only built when indexed or iterated"""
+
+    __slots__ = ("maze",)
+
+    def __init__(self, maze):
+        self.maze = maze
+
+    def __len__(self):
+        return len(self.maze.walls)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [Cell(self.maze, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("cell index out of range")
+        return Cell(self.maze, index)
+
+    def __iter__(self):
+        maze = self.maze
+        return (Cell(maze, i) for i in range(len(maze.walls)))
 
 
 class Maze:
-    def __init__(self, cols, rows):
+    def __init__(
+        self, cols, rows, generator="dfs", seed=None, walls=None, scratch=None, braid=0.0, max_cost=1, costs=None,
+    ):
         self.cols = cols
         self.rows = rows
-        self.grid_cells = []
+        self.generator = generator
+        # fraction of dead ends opened into loops and the highest cell cost, applied on generation
+        self.braid = braid
+        self.max_cost = max_cost
+        # cell costs of a maze given by its walls; generated ones are drawn from the seed
+        self.costs = costs
+        # always record a seed so that every maze can be reproduced
+        self.seed = seed if seed is not None else randrange(2**32)
+        self.walls = bytearray()
+        self.grid_cells = GridCells(self)
+        self._visited = None
+        # optional mazefile.ScratchSpace holding solver working arrays on disk
+        self.scratch = scratch
         self.explored_cells = set()
         self.correct_path = []
         self.start = (0, 0)
         self.goal = (cols - 1, rows - 1)
         self.stats = {}
-        self.generate_maze()
+        self.deltas = neighbor_deltas(cols)
+        self._junctions = None
+        self._path_index = None
+        if walls is None:
+            self.generate_maze()
+        else:
+            self.walls = walls
+
+    @classmethod
+    def open(cls, path, scratch_dir=None):
+        """Open a maze file lazily: walls stay memory-mapped and solver state goes to
+        mapped scratch files in `scratch_dir` (default: the system temp directory)"""
+        from mazefile import FLAG_COSTS, FLAG_PATH, MappedWalls, ScratchSpace, read_costs, read_solution
+        walls = MappedWalls(path)
+        maze = cls(
+            walls.cols, walls.rows, walls.generator, walls.seed,
+            walls=walls, scratch=ScratchSpace(scratch_dir),
+        )
+        with open(path, "rb") as f:
+            if walls.flags & FLAG_PATH:
+                maze.correct_path = read_solution(f, walls.cols, walls.rows)[0]
+            if walls.flags & FLAG_COSTS:
+                maze.costs = read_costs(f, walls.cols, walls.rows, walls.flags)
+        return maze
+
+    @classmethod
+    def load(cls, path):
+        """Load a maze saved with Maze.save (and its path, if one was saved) into memory"""
+        from mazefile import FLAG_COSTS, load_maze, read_costs
+        (cols, rows, seed, generator, flags), walls, solution = load_maze(path)
+        maze = cls(cols, rows, generator, seed, walls=walls)
+        if solution:
+            maze.correct_path = solution[0]
+        if flags & FLAG_COSTS:
+            with open(path, "rb") as f:
+                maze.costs = read_costs(f, cols, rows, flags)
+        return maze
+
+    def save(self, path, include_path=True):
+        """Write the maze, plus the current correct_path when include_path is set"""
+        from mazefile import save_walls
+        solution = None
+        if include_path and self.correct_path:
+            solution = (self.correct_path, self.correct_path[-1] == self.goal)
+        walls = self.walls.unpack() if hasattr(self.walls, "unpack") else self.walls
+        save_walls(path, walls, self.cols, self.rows, self.seed, self.generator, solution, costs=self.costs)
+
+    def close(self):
+        """Release the mappings of a maze opened with Maze.open"""
+        if hasattr(self.walls, "close"):
+            self.walls.close()
+        if self.scratch is not None:
+            self.scratch.close()
+
+    def new_flags(self):
+        """Zeroed byte per cell, for solver visited/closed flags"""
+        if self.scratch is not None:
+            return self.scratch.flags(len(self.walls))
+        return bytearray(len(self.walls))
+
+    def new_indices(self):
+        """Int per cell filled with -1, for solver parent pointers and costs"""
+        if self.scratch is not None:
+            return self.scratch.indices(len(self.walls))
+        return array("i", [-1]) * len(self.walls)
+
+    @property
+    def visited(self):
+        """Per-cell visited flags, only allocated when the Cell API asks for them"""
+        if self._visited is None or len(self._visited) != len(self.walls):
+            self._visited = bytearray(len(self.walls))
+        return self._visited
+
+    def index(self, x, y):
+        return x + y * self.cols
+
+    def coords(self, index):
+        y, x = divmod(index, self.cols)
+        return (x, y)
+
+    def open_neighbors(self, index):
+        """Indices of the cells reachable from `index` through a missing wall"""
+        return [index + delta for delta in self.deltas[self.walls[index]]]
+
+    def path_cost(self, path):
+        """Cost of walking `path`: the cost of every cell entered after the first"""
+        if self.costs is None:
+            return max(0, len(path) - 1)
+        costs, cols = self.costs, self.cols
+        return sum(costs[x + y * cols] for x, y in path[1:])
+
+    def loop_count(self):
+        """Independent loops: open passages beyond the cells - 1 a perfect maze has"""
+        passages = sum(len(self.deltas[mask]) for mask in self.walls) // 2
+        return passages - (len(self.walls) - 1)
+
+    def junction_graph(self, start=None, goal=None):
+        """Corridor-contracted graph keeping start and goal as nodes, cached until the
+        walls array or the endpoints change (call reset_indexes after in-place edits)"""
+        from junctions import JunctionGraph
+        start = start if start is not None else self.start
+        goal = goal if goal is not None else self.goal
+        cached = self._junctions
+        if cached is None or cached[0] is not self.walls or cached[1:3] != (start, goal):
+            self._junctions = (self.walls, start, goal, JunctionGraph(self, (start, goal)))
+        return self._junctions[3]
+
+    def path_index(self):
+        """LCA index for point-to-point path queries (see tree_index.py), cached until the
+        walls array changes (call reset_indexes after in-place edits)"""
+        from tree_index import PathIndex
+        cached = self._path_index
+        if cached is None or cached[0] is not self.walls:
+            self._path_index = (self.walls, PathIndex(self))
+        return self._path_index[1]
+
+    def path(self, a, b):
+        """Shortest path between two cells of a perfect maze, answered from path_index"""
+        return self.path_index().path(a, b)
+
+    def distance_field(self, goals=None):
+        """Steps from every cell to the nearest of `goals` (default: the goal), with a
+        next-step pointer per cell for agents to follow (see distance_field.py)"""
+        from distance_field import DistanceField
+        return DistanceField(self, goals)
+
+    def reset_indexes(self):
+        """Drop the cached junction graph and path index"""
+        self._junctions = None
+        self._path_index = None
 
     def generate_maze(self):
-        """Generate a perfect maze using DFS algorithm"""
-        self.grid_cells = [Cell(col, row, self.cols, self.rows) 
-                           for row in range(self.rows) 
-                           for col in range(self.cols)]
-        current_cell = self.grid_cells[0]
-        array = []
-        break_count = 1
-
-        while break_count != len(self.grid_cells):
-            current_cell.visited = True
-            next_cell = current_cell.check_neighbors(self.grid_cells)
-            if next_cell:
-                next_cell.visited = True
-                break_count += 1
-                array.append(current_cell)
-                self.remove_walls(current_cell, next_cell)
-                current_cell = next_cell
-            elif array:
-                current_cell = array.pop()
-        
-        # Reset the visited status for all cells for future use
-        for cell in self.grid_cells:
-            cell.visited = False
-        
+        """Generate a maze with the configured generator and seed, then braid it and
+        draw its cell costs if asked to"""
+        from generators import braid, get_generator, terrain_costs
+        with instruments.timer("generate"):
+            rng = Random(self.seed)
+            self.walls = get_generator(self.generator)(self.cols, self.rows, rng)
+            if self.braid:
+                braid(self.walls, self.cols, self.rows, rng, self.braid)
+            self.costs = terrain_costs(self.cols, self.rows, rng, self.max_cost) if self.max_cost > 1 else None
+        self._visited = None
+        self._junctions = None
+        self._path_index = None
         return self.grid_cells
 
     def remove_walls(self, current, next):
@@ -114,20 +361,29 @@ class Maze:
             next.walls["top"] = False
 
     def run_dfs(self, screen, draw_maze, clock, solving_speed):
-        """Moved from solver.py - will serve as a placeholder for the actual implementation"""
-        from solver import run_dfs
-        return run_dfs(
-            self.grid_cells,
-            self.start,
-            self.goal,
-            self.cols,
-            self.explored_cells,
-            screen,
-            draw_maze,
-            clock,
-            self.stats,
-            solving_speed,
+        """Solve with DFS, animating every step through draw_maze"""
+        return self.run_solver("dfs", screen, draw_maze, clock, solving_speed)
+
+    def run_solver(self, name, screen, draw_maze, clock, solving_speed):
+        """Solve with a registered solver, animating every step through draw_maze"""
+        from draw import StepRenderer
+        renderer = StepRenderer(
+            screen, draw_maze, self.grid_cells, self.cols, self.rows, solving_speed
         )
+        return self.solve(renderer, name)
+
+    def solve(self, on_step=None, solver="dfs"):
+        """Headless solve from start to goal; on_step is an optional per-step observer"""
+        path, found, self.explored_cells, self.stats = get_solver(solver)(
+            self, self.start, self.goal, on_step, self.explored_cells
+        )
+        return (path, found)
+
+    def search(self, solver="dfs"):
+        """Start a resumable SolverRun over this maze's explored cells and stats"""
+        run = SolverRun(self, solver, self.start, self.goal, self.explored_cells)
+        self.explored_cells, self.stats = run.explored, run.stats
+        return run
 
     def reset(self):
         """Reset the maze for a new run"""
@@ -136,8 +392,8 @@ class Maze:
         self.stats = {}
 
 # Maintain backwards compatibility with existing code
-def generate_maze(cols, rows):
-    maze = Maze(cols, rows)
+def generate_maze(cols, rows, generator="dfs", seed=None):
+    maze = Maze(cols, rows, generator, seed)
     return maze.grid_cells
 
 def remove_walls(current, next):
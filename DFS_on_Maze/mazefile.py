@@ -0,0 +1,384 @@
+import argparse
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+from array import array
+from random import Random, randrange
+
+#    ╔══════════════════════════════════════════════════════════════════════╗
+#    ║  On-disk maze format for mazes too large for memory.                 ║
+#    ║                                                                      ║
+#    ║  A 40-byte header (magic, version, flags, cols, rows, seed,          ║
+#    ║  generator name) is followed by the wall masks packed two cells per  ║
+#    ║  byte: cell i lives in the low nibble of byte i // 2 when i is even  ║
+#    ║  and in the high nibble when it is odd. Files are read through mmap  ║
+#    ║  so only the pages a solver touches are ever loaded.                 ║
+#    ║                                                                      ║
+#    ║  When the PATH flag is set the walls are followed by a saved path:   ║
+#    ║  a uint32 length, a uint8 found flag and that many uint32 cell       ║
+#    ║  indices. MazeCache keeps such files keyed by the maze parameters.   ║
+#    ║  The EVENTS flag appends the order the solver explored cells in (a   ║
+#    ║  uint32 count and that many uint32 indices), the event log that      ║
+#    ║  export.py renders frames from; it always comes with a path. The     ║
+#    ║  COSTS flag appends the per-cell traversal costs, one byte per cell. ║
+#    ║                                                                      ║
+#    ║      python mazefile.py generate big.maze 20000 20000                ║
+#    ║      python mazefile.py solve big.maze --solver bfs                  ║
+#    ╚══════════════════════════════════════════════════════════════════════╝
+
+MAGIC = b"MAZE"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIIQ16s")
+PATH_HEADER = struct.Struct("<IB")
+EVENTS_HEADER = struct.Struct("<I")
+
+# header flags
+FLAG_PATH = 1
+FLAG_EVENTS = 2
+FLAG_COSTS = 4
+
+# bytes.translate tables for nibble packing
+LOW_NIBBLE = bytes(i & 0x0F for i in range(256))
+HIGH_NIBBLE = bytes(i >> 4 for i in range(256))
+SHIFT_UP = bytes((i << 4) & 0xFF for i in range(256))
+
+# seeds are stored as unsigned 64-bit integers
+MAX_SEED = 2**64 - 1
+
+# rows are packed and written in chunks of about this many cells
+WRITE_CHUNK = 1 << 22
+
+
+class MazeFileError(ValueError):
+    """Raised when a file is not a maze file this version can read"""
+
+
+def pack_walls(walls):
+    """Pack one-byte-per-cell wall masks into two cells per byte"""
+    low, high = bytes(walls[0::2]), bytes(walls[1::2]).translate(SHIFT_UP)
+    if len(high) < len(low):
+        high += b"\0"
+    return (int.from_bytes(low, "little") | int.from_bytes(high, "little")).to_bytes(len(low), "little")
+
+
+def unpack_walls(packed, cells):
+    """Inverse of pack_walls; returns a bytearray with one wall mask per cell"""
+    walls = bytearray(len(packed) * 2)
+    walls[0::2] = packed.translate(LOW_NIBBLE)
+    walls[1::2] = packed.translate(HIGH_NIBBLE)
+    del walls[cells:]
+    return walls
+
+
+def check_seed(seed):
+    """Returns the seed if a maze file can store it, raises ValueError otherwise"""
+    if not 0 <= seed <= MAX_SEED:
+        raise ValueError(f"seed must be between 0 and {MAX_SEED}, got {seed}")
+    return seed
+
+
+def seed_arg(value):
+    """argparse type for a seed that can be saved with the maze"""
+    try:
+        return check_seed(int(value))
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(str(error))
+
+
+def write_header(f, cols, rows, seed, generator, flags=0):
+    check_seed(seed)
+    f.write(HEADER.pack(MAGIC, VERSION, flags, cols, rows, seed, generator.encode("ascii")))
+
+
+def read_header(f):
+    """Returns (cols, rows, seed, generator, flags)"""
+    data = f.read(HEADER.size)
+    if len(data) < HEADER.size:
+        raise MazeFileError("file too short for a maze header")
+    magic, version, flags, cols, rows, seed, generator = HEADER.unpack(data)
+    if magic != MAGIC:
+        raise MazeFileError("not a maze file")
+    if version != VERSION:
+        raise MazeFileError(f"unsupported maze file version {version}")
+    return cols, rows, seed, generator.rstrip(b"\0").decode("ascii"), flags
+
+
+def _write_indices(f, indices):
+    if sys.byteorder == "big":
+        indices = array("I", indices)
+        indices.byteswap()
+    f.write(indices.tobytes())
+
+
+def _read_indices(f, length):
+    indices = array("I")
+    indices.frombytes(f.read(length * 4))
+    if sys.byteorder == "big":
+        indices.byteswap()
+    return indices
+
+
+def save_walls(path, walls, cols, rows, seed, generator, solution=None, events=None, costs=None):
+    """Write an in-memory maze to `path`; `solution` is an optional (path, found),
+    `events` an optional array("I") of cell indices in exploration order and
+    `costs` optional per-cell traversal costs"""
+    if events is not None and not solution:
+        solution = ([], False)
+    flags = (
+        (FLAG_PATH if solution else 0)
+        | (FLAG_EVENTS if events is not None else 0)
+        | (FLAG_COSTS if costs is not None else 0)
+    )
+    with open(path, "wb") as f:
+        write_header(f, cols, rows, seed, generator, flags)
+        f.write(pack_walls(walls))
+        if solution:
+            cells, found = solution
+            f.write(PATH_HEADER.pack(len(cells), 1 if found else 0))
+            _write_indices(f, array("I", (x + y * cols for x, y in cells)))
+        if events is not None:
+            f.write(EVENTS_HEADER.pack(len(events)))
+            _write_indices(f, events)
+        if costs is not None:
+            f.write(costs)
+
+
+def read_solution(f, cols, rows):
+    """Read the saved (path, found) that follows the walls; `f` is positioned anywhere"""
+    f.seek(HEADER.size + (cols * rows + 1) // 2)
+    length, found = PATH_HEADER.unpack(f.read(PATH_HEADER.size))
+    return [(i % cols, i // cols) for i in _read_indices(f, length)], bool(found)
+
+
+def read_events(f, cols, rows):
+    """Read the saved exploration order (array("I") of cell indices); `f` is positioned anywhere"""
+    f.seek(HEADER.size + (cols * rows + 1) // 2)
+    length, _ = PATH_HEADER.unpack(f.read(PATH_HEADER.size))
+    f.seek(length * 4, os.SEEK_CUR)
+    (count,) = EVENTS_HEADER.unpack(f.read(EVENTS_HEADER.size))
+    return _read_indices(f, count)
+
+
+def read_costs(f, cols, rows, flags):
+    """Read the saved per-cell costs, which follow every other section; `f` is positioned anywhere"""
+    f.seek(HEADER.size + (cols * rows + 1) // 2)
+    if flags & FLAG_PATH:
+        length, _ = PATH_HEADER.unpack(f.read(PATH_HEADER.size))
+        f.seek(length * 4, os.SEEK_CUR)
+    if flags & FLAG_EVENTS:
+        (count,) = EVENTS_HEADER.unpack(f.read(EVENTS_HEADER.size))
+        f.seek(count * 4, os.SEEK_CUR)
+    return bytearray(f.read(cols * rows))
+
+
+def load_maze(path):
+    """Read a whole maze file into memory; returns (header, walls, solution).
+
+    `header` is (cols, rows, seed, generator, flags) and `solution` is the
+    saved (path, found) or None.
+    """
+    with open(path, "rb") as f:
+        header = read_header(f)
+        cols, rows, _, _, flags = header
+        walls = unpack_walls(f.read((cols * rows + 1) // 2), cols * rows)
+        solution = read_solution(f, cols, rows) if flags & FLAG_PATH else None
+    return header, walls, solution
+
+
+class MazeCache:
+    """Content-addressed store of maze files keyed by (cols, rows, generator, seed)"""
+
+    def __init__(self, directory=None):
+        self.directory = directory or os.environ.get(
+            "MAZE_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "dfs_on_maze")
+        )
+
+    def path_for(self, cols, rows, generator, seed, braid=0.0, max_cost=1):
+        # checked here so a bad seed fails before the maze is generated, not when saving it
+        check_seed(seed)
+        key = f"{cols}x{rows}:{generator}:{seed}"
+        # plain perfect mazes keep the keys they had before braiding existed
+        if braid or max_cost != 1:
+            key += f":braid={braid}:cost={max_cost}"
+        return os.path.join(self.directory, hashlib.sha1(key.encode("ascii")).hexdigest() + ".maze")
+
+    def get(self, cols, rows, generator="dfs", seed=0, braid=0.0, max_cost=1):
+        """Load the maze from the cache, generating and storing it on a miss"""
+        from maze import Maze
+
+        path = self.path_for(cols, rows, generator, seed, braid, max_cost)
+        if os.path.exists(path):
+            return Maze.load(path)
+        maze = Maze(cols, rows, generator, seed, braid=braid, max_cost=max_cost)
+        os.makedirs(self.directory, exist_ok=True)
+        # write under a temporary name so readers never see a partial file
+        partial = f"{path}.{os.getpid()}.tmp"
+        maze.save(partial, include_path=False)
+        os.replace(partial, path)
+        return maze
+
+
+def write_maze(path, cols, rows, generator="dfs", seed=None):
+    """Generate a maze straight into a file; returns the seed used.
+
+    Generators that can emit finished rows (Eller's) are streamed, so the
+    maze never has to fit in memory; the others are built in memory first.
+    """
+    from generators import ROW_GENERATORS, get_generator
+
+    seed = seed if seed is not None else randrange(2**32)
+    rng = Random(seed)
+    if generator not in ROW_GENERATORS:
+        save_walls(path, get_generator(generator)(cols, rows, rng), cols, rows, seed, generator)
+        return seed
+
+    with open(path, "wb") as f:
+        write_header(f, cols, rows, seed, generator)
+        pending = bytearray()
+        for row in ROW_GENERATORS[generator](cols, rows, rng):
+            pending += row
+            if len(pending) >= WRITE_CHUNK:
+                # keep an odd trailing cell for the next chunk's byte
+                split = len(pending) & ~1
+                f.write(pack_walls(pending[:split]))
+                del pending[:split]
+        if pending:
+            f.write(pack_walls(pending))
+    return seed
+
+
+class MappedWalls:
+    """Read-only sequence of wall masks over a memory-mapped maze file"""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.cols, self.rows, self.seed, self.generator, self.flags = read_header(f)
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._cells = self.cols * self.rows
+        self._offset = HEADER.size
+
+    def __len__(self):
+        return self._cells
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._cells
+        if not 0 <= index < self._cells:
+            raise IndexError("cell index out of range")
+        byte = self._map[self._offset + (index >> 1)]
+        return (byte >> 4) if index & 1 else (byte & 0x0F)
+
+    def __iter__(self):
+        # the path and cost sections follow the walls in the file, never read into them
+        for byte in self._map[self._offset:self._offset + self._cells // 2]:
+            yield byte & 0x0F
+            yield byte >> 4
+        if self._cells & 1:
+            yield self._map[self._offset + self._cells // 2] & 0x0F
+
+    def unpack(self):
+        """Load every wall mask into a bytearray"""
+        packed = self._map[self._offset:self._offset + (self._cells + 1) // 2]
+        return unpack_walls(packed, self._cells)
+
+    def close(self):
+        self._map.close()
+
+
+class ScratchSpace:
+    """Solver working arrays backed by memory-mapped temporary files"""
+
+    def __init__(self, directory=None):
+        self.directory = directory
+        self._maps = []
+
+    def _map(self, size, fill):
+        f = tempfile.TemporaryFile(dir=self.directory)
+        if fill:
+            block = bytes([fill]) * (1 << 20)
+            for _ in range(size // len(block)):
+                f.write(block)
+            f.write(block[:size % len(block)])
+        else:
+            f.truncate(size)
+        f.flush()
+        mapped = mmap.mmap(f.fileno(), size)
+        f.close()
+        self._maps.append(mapped)
+        return mapped
+
+    def flags(self, cells):
+        """Zeroed byte per cell"""
+        return self._map(max(cells, 1), 0)
+
+    def indices(self, cells):
+        """Signed 32-bit int per cell, all -1"""
+        return memoryview(self._map(max(cells, 1) * 4, 0xFF)).cast("i")
+
+    def close(self):
+        for mapped in self._maps:
+            try:
+                mapped.close()
+            except BufferError:
+                # a memoryview over it is still alive; it is released with it
+                pass
+        self._maps = []
+
+
+class ExploredCount:
+    """Stand-in for the explored set that only counts, for mazes too big to track"""
+
+    def __init__(self):
+        self.count = 0
+
+    def add(self, cell):
+        self.count += 1
+
+    def __len__(self):
+        return self.count
+
+
+def peak_rss_mb():
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate and solve on-disk mazes")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate = commands.add_parser("generate", help="write a new maze file")
+    generate.add_argument("path")
+    generate.add_argument("cols", type=int)
+    generate.add_argument("rows", type=int)
+    generate.add_argument("--generator", default="eller")
+    generate.add_argument("--seed", type=seed_arg)
+
+    solve = commands.add_parser("solve", help="solve a maze file without loading it")
+    solve.add_argument("path")
+    solve.add_argument("--solver", default="bfs")
+    solve.add_argument("--scratch-dir", help="directory for the solver's mapped working files")
+
+    args = parser.parse_args()
+    start = time.perf_counter()
+    if args.command == "generate":
+        seed = write_maze(args.path, args.cols, args.rows, args.generator, args.seed)
+        print(f"wrote {args.path}: {args.cols}x{args.rows} {args.generator} seed {seed}, "
+              f"{os.path.getsize(args.path) / 2**20:.1f} MB")
+    else:
+        from maze import Maze
+        maze = Maze.open(args.path, scratch_dir=args.scratch_dir)
+        maze.explored_cells = ExploredCount()
+        path, found = maze.solve(solver=args.solver)
+        print(f"{args.solver}: found={found} path_length={len(path)} "
+              f"nodes_visited={maze.stats['nodes_visited']}")
+        maze.close()
+    print(f"{time.perf_counter() - start:.2f} s, peak RSS {peak_rss_mb():.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
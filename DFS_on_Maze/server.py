@@ -0,0 +1,297 @@
+import argparse
+import asyncio
+import base64
+import json
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from random import randrange
+
+from config import SERVICE_CACHE_BYTES, SERVICE_HOST, SERVICE_MAX_CELLS, SERVICE_PORT
+from generators import get_generator
+from maze import Maze
+from mazefile import pack_walls
+from solver import get_solver
+
+#    ╔══════════════════════════════════════════════════════════════════════╗
+#    ║  Local maze service: newline-delimited JSON over TCP.                ║
+#    ║                                                                      ║
+#    ║      {"id": 1, "op": "solve", "cols": 50, "rows": 50,                ║
+#    ║       "generator": "dfs", "seed": 7, "solver": "bfs"}                ║
+#    ║      {"id": 1, "ok": true, "result": {"found": true, ...}}           ║
+#    ║                                                                      ║
+#    ║  Ops: generate (walls nibble-packed and base64-encoded, plus cell    ║
+#    ║  costs for weighted mazes), solve (path and counters), query         ║
+#    ║  (distances, optionally paths, between cell pairs through the        ║
+#    ║  maze's PathIndex, perfect mazes only) and stats. generate and       ║
+#    ║  solve take optional "braid" and "max_cost" fields (see maze.py).    ║
+#    ║  Requests on one connection run concurrently and are answered as     ║
+#    ║  they finish.                                                        ║
+#    ║                                                                      ║
+#    ║  Mazes are rebuilt from their seed in a process pool whose workers   ║
+#    ║  keep their most recent mazes and path indexes, and results are      ║
+#    ║  JSON-encoded once, in the worker. Identical requests in flight      ║
+#    ║  share one computation; finished results stay in an LRU cache        ║
+#    ║  bounded by their encoded size. Requests without a seed get a new    ║
+#    ║  maze each time and bypass every cache.                              ║
+#    ║                                                                      ║
+#    ║      python server.py --workers 4                                    ║
+#    ║      python client.py --requests 5000 --concurrency 32               ║
+#    ╚══════════════════════════════════════════════════════════════════════╝
+
+# mazes (with their path indexes) each worker process keeps for repeat requests
+WORKER_MAZES = 8
+# longest request line, in bytes (queries carry their cell pairs)
+REQUEST_LIMIT = 1 << 24
+
+
+@lru_cache(maxsize=WORKER_MAZES)
+def _cached_maze(cols, rows, generator, seed, braid, max_cost):
+    return Maze(cols, rows, generator, seed, braid=braid, max_cost=max_cost)
+
+
+def _maze(spec):
+    """The maze for a (cols, rows, generator, seed, braid, max_cost, seeded) spec; mazes
+    the service picked a seed for are never asked for again, so they are not kept"""
+    *spec, seeded = spec
+    if seeded:
+        return _cached_maze(*spec)
+    cols, rows, generator, seed, braid, max_cost = spec
+    return Maze(cols, rows, generator, seed, braid=braid, max_cost=max_cost)
+
+
+def _encode(result):
+    return json.dumps(result, separators=(",", ":")).encode()
+
+
+def generate(spec):
+    """Worker: the maze's wall masks, packed two per byte (mazefile.pack_walls), and
+    its cell costs (one byte per cell, null when every step costs 1)"""
+    maze = _maze(spec)
+    return _encode({
+        "cols": maze.cols,
+        "rows": maze.rows,
+        "generator": maze.generator,
+        "seed": maze.seed,
+        "braid": maze.braid,
+        "max_cost": maze.max_cost,
+        "walls": base64.b64encode(pack_walls(maze.walls)).decode("ascii"),
+        "costs": base64.b64encode(maze.costs).decode("ascii") if maze.costs is not None else None,
+    })
+
+
+def solve(spec, solver):
+    """Worker: solve from the maze's start to its goal"""
+    maze = _maze(spec)
+    start = time.perf_counter()
+    path, found, _, stats = get_solver(solver)(maze, maze.start, maze.goal)
+    return _encode({
+        "seed": maze.seed,
+        "solver": solver,
+        "found": found,
+        "path": path,
+        "path_cost": maze.path_cost(path),
+        "nodes_visited": stats["nodes_visited"],
+        "dead_ends": stats["dead_ends"],
+        "solve_s": time.perf_counter() - start,
+    })
+
+
+def query(spec, pairs, paths):
+    """Worker: distances (and paths) between cell pairs, answered by the maze's PathIndex"""
+    maze = _maze(spec)
+    index = maze.path_index()
+    result = {"seed": maze.seed, "distances": index.distances(pairs)}
+    if paths:
+        result["paths"] = index.paths(pairs)
+    return _encode(result)
+
+
+def _cell(value, cols, rows):
+    x, y = (int(v) for v in value)
+    if not (0 <= x < cols and 0 <= y < rows):
+        raise ValueError(f"cell {(x, y)} is outside the {cols}x{rows} maze")
+    return (x, y)
+
+
+def parse_request(request):
+    """Validate a request; returns (cache key, worker function, arguments), the key
+    being None for requests that must not be cached"""
+    op = request.get("op")
+    if op not in ("generate", "solve", "query"):
+        raise ValueError(f"unknown op {op!r}, expected one of: generate, solve, query, stats")
+    cols, rows = int(request.get("cols", 0)), int(request.get("rows", 0))
+    if cols < 1 or rows < 1 or cols * rows > SERVICE_MAX_CELLS:
+        raise ValueError(f"maze size must be at least 1x1 and at most {SERVICE_MAX_CELLS} cells")
+    generator = request.get("generator", "dfs")
+    get_generator(generator)
+    braid, max_cost = float(request.get("braid", 0.0)), int(request.get("max_cost", 1))
+    if op == "query" and ("braid" in request or "max_cost" in request):
+        raise ValueError("query answers step distances on perfect mazes, braid and max_cost are not accepted")
+    if not 0.0 <= braid <= 1.0:
+        raise ValueError(f"braid must be between 0 and 1, got {braid}")
+    if not 1 <= max_cost <= 255:
+        raise ValueError(f"max_cost must be between 1 and 255, got {max_cost}")
+    seed = request.get("seed")
+    # without a seed the maze is new, so it can never be served from a cache
+    seeded = seed is not None
+    seed = int(seed) if seeded else randrange(2**32)
+    spec = (cols, rows, generator, seed, braid, max_cost, seeded)
+
+    if op == "generate":
+        key, args = (op, spec), (spec,)
+        func = generate
+    elif op == "solve":
+        solver = request.get("solver", "bfs")
+        get_solver(solver)
+        key, args = (op, spec, solver), (spec, solver)
+        func = solve
+    else:
+        pairs = tuple((_cell(a, cols, rows), _cell(b, cols, rows)) for a, b in request.get("pairs", ()))
+        paths = bool(request.get("paths", False))
+        key, args = (op, spec, pairs, paths), (spec, pairs, paths)
+        func = query
+    return (key if seeded else None), func, args
+
+
+class ResultCache:
+    """LRU cache of encoded results, bounded by their total size in bytes"""
+
+    def __init__(self, max_bytes=SERVICE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries = OrderedDict()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        body = self.entries.get(key)
+        if body is not None:
+            self.entries.move_to_end(key)
+        return body
+
+    def put(self, key, body):
+        if len(body) > self.max_bytes:
+            return
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.size -= len(old)
+        self.entries[key] = body
+        self.size += len(body)
+        while self.size > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= len(evicted)
+
+
+class MazeService:
+    """Answers requests from the cache, from a computation already in flight or
+    from a new one in the process pool"""
+
+    def __init__(self, workers=None, cache_bytes=SERVICE_CACHE_BYTES):
+        self.pool = ProcessPoolExecutor(workers)
+        self.cache = ResultCache(cache_bytes)
+        # cache key -> future of the computation every identical request waits on
+        self.inflight = {}
+        self.stats = dict.fromkeys(("requests", "cache_hits", "coalesced", "computed", "errors"), 0)
+
+    async def handle(self, request):
+        """Encoded result of one request; raises ValueError for bad requests"""
+        self.stats["requests"] += 1
+        if request.get("op") == "stats":
+            return _encode({**self.stats, "cached": len(self.cache), "cache_bytes": self.cache.size})
+        key, func, args = parse_request(request)
+        if key is None:
+            self.stats["computed"] += 1
+            return await asyncio.get_running_loop().run_in_executor(self.pool, func, *args)
+
+        body = self.cache.get(key)
+        if body is not None:
+            self.stats["cache_hits"] += 1
+            return body
+        future = self.inflight.get(key)
+        if future is not None:
+            self.stats["coalesced"] += 1
+        else:
+            self.stats["computed"] += 1
+            future = asyncio.get_running_loop().run_in_executor(self.pool, func, *args)
+            self.inflight[key] = future
+            future.add_done_callback(lambda done: self._finished(key, done))
+        # a client that goes away must not cancel the others' computation
+        return await asyncio.shield(future)
+
+    def _finished(self, key, future):
+        del self.inflight[key]
+        if not future.cancelled() and future.exception() is None:
+            self.cache.put(key, future.result())
+
+    async def serve_client(self, reader, writer):
+        tasks = set()
+        try:
+            while line := await reader.readline():
+                task = asyncio.create_task(self._respond(line, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            await asyncio.gather(*tasks)
+        except (ConnectionError, ValueError):
+            # the client went away, or sent a line longer than REQUEST_LIMIT
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, line, writer):
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            body = await self.handle(request)
+            response = b'{"id":%s,"ok":true,"result":%s}\n' % (json.dumps(request_id).encode(), body)
+        except Exception as error:
+            # anything a request breaks is reported to its client, the service keeps running
+            self.stats["errors"] += 1
+            response = _encode({"id": request_id, "ok": False, "error": f"{type(error).__name__}: {error}"}) + b"\n"
+        if not writer.is_closing():
+            writer.write(response)
+            await writer.drain()
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+
+async def serve(host=SERVICE_HOST, port=SERVICE_PORT, workers=None, cache_bytes=SERVICE_CACHE_BYTES, ready=None):
+    """Run the service until cancelled; `ready` is an optional callback taking the server"""
+    service = MazeService(workers, cache_bytes)
+    server = await asyncio.start_server(service.serve_client, host, port, limit=REQUEST_LIMIT)
+    try:
+        if ready is not None:
+            ready(server)
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve mazes and solutions over a local socket")
+    parser.add_argument("--host", default=SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=SERVICE_PORT)
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per core)")
+    parser.add_argument(
+        "--cache-mb", type=float, default=SERVICE_CACHE_BYTES / 2**20,
+        help="size of the result cache in MiB",
+    )
+    args = parser.parse_args()
+
+    def ready(server):
+        host, port = server.sockets[0].getsockname()[:2]
+        print(f"serving on {host}:{port}")
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, int(args.cache_mb * 2**20), ready))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,101 +1,504 @@
+import heapq
 import time
-import pygame
-from draw import Drawing
+from array import array
+from collections import deque
+
+from instrument import instruments
 
 #    ╔═════════════════════════════════════════════════════════════════════════╗
-#    ║                             run_dfs()                                   ║
+#    ║                         Solver registry                                 ║
+#    ║                                                                         ║
+#    ║  Every solver has the signature                                         ║
+#    ║                                                                         ║
+#    ║      solver(maze, start, goal, on_step=None, explored=None)             ║
+#    ║          -> (path, found, explored, stats)                              ║
+#    ║                                                                         ║
+#    ║  and works over the packed maze without touching the display. `stats`   ║
+#    ║  always holds start_time, end_time, nodes_visited, dead_ends and        ║
+#    ║  path_length so runs can be compared. Each cell records its parent in   ║
+#    ║  a flat int array and the path is rebuilt once, when the search ends.   ║
+#    ║  Nodes are expanded through maze.deltas (the index offsets of the open  ║
+#    ║  sides of every wall mask), so no objects are built per expansion.      ║
 #    ║                                                                         ║
-#    ║  Executes a modified depth-first search that dynamically renders        ║
-#    ║  maze exploration on-screen by updating at each step, while tracking    ║
-#    ║  statistics (nodes visited, dead-ends, path length) and adjusting the   ║
-#    ║  solving speed via key events; returns the solution path or a dead-end  ║
-#    ║  if no valid route to the goal is found.                                ║
+#    ║  All of them handle braided mazes with loops. When the maze has cell    ║
+#    ║  costs, astar, dijkstra and the junction_* solvers return the cheapest  ║
+#    ║  path; the BFS-based ones still return the one with fewest steps.       ║
+#    ║                                                                         ║
+#    ║  Rendering is optional: pass an `on_step(explored, path, failed, cell)` ║
+#    ║  observer and it is called once per explored cell (path=None, cell is   ║
+#    ║  the newly explored (x, y)) and once with the final path. Returning     ║
+#    ║  False from it aborts the search.                                       ║
+#    ║                                                                         ║
+#    ║  Underneath, each solver is a step generator (STEPPERS) that yields     ║
+#    ║  every newly explored cell and returns (path, found). SOLVERS is built  ║
+#    ║  from them, wrapping each in a function that runs it to the end;        ║
+#    ║  SolverRun drives one a few steps at a time, so a UI can animate it     ║
+#    ║  frame by frame. Register a new solver in STEPPERS only.                ║
 #    ╚═════════════════════════════════════════════════════════════════════════╝
 
-def run_dfs(
-    grid_cells,
-    start,
-    goal,
-    cols,
-    explored_cells,
-    screen,
-    draw_maze_func,
-    clock,
-    stats,
-    SOLVING_SPEED,
-):
-    stats["start_time"] = time.time()
-    stats["nodes_visited"] = 0
-    stats["dead_ends"] = 0
 
-    start_cell = grid_cells[start[0] + start[1] * cols]
-    goal_cell = grid_cells[goal[0] + goal[1] * cols]
-    stack = [(start_cell, [])]
-    visited = set()
+def dfs_steps(maze, start, goal, explored, stats):
+    """Modified depth-first search; gives up with the dead-end path at the first dead end"""
+    cols = maze.cols
+    walls, deltas = maze.walls, maze.deltas
+    goal_index = maze.index(*goal)
+    visited = maze.new_flags()
+    parents = maze.new_indices()
+    stack = [(maze.index(*start), -1)]
 
     while stack:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                return ([], False)
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_UP:
-                    SOLVING_SPEED = max(5, SOLVING_SPEED - 5)
-                elif event.key == pygame.K_DOWN:
-                    SOLVING_SPEED = min(500, SOLVING_SPEED + 5)
-
-        current, current_path = stack.pop()
-        current_coords = (current.x, current.y)
+        current, parent = stack.pop()
         stats["nodes_visited"] += 1
 
-        if current_coords in visited:
+        if visited[current]:
             continue
-        visited.add(current_coords)
-        explored_cells.add(current_coords)
-
-        pygame.time.delay(SOLVING_SPEED)
-        draw_maze_func(grid_cells, cols, len(grid_cells) // cols, explored_cells)
-        pygame.display.flip()
-
-        if current == goal_cell:
-            final_path = current_path + [current_coords]
-            draw_maze_func(
-                grid_cells,
-                cols,
-                len(grid_cells) // cols,
-                explored_cells,
-                final_path,
-                failed=False,
-            )
-            pygame.display.flip()
-            stats["end_time"] = time.time()
-            stats["path_length"] = len(final_path)
-            return (final_path, True)
-
-        neighbors = current.get_neighbors(grid_cells)
-        unvisited_neighbors = [n for n in neighbors if (n.x, n.y) not in visited]
+        visited[current] = 1
+        parents[current] = parent
+        coords = (current % cols, current // cols)
+        explored.add(coords)
+        yield coords
+
+        if current == goal_index:
+            return build_path(parents, current, cols), True
+
+        unvisited_neighbors = [
+            current + delta for delta in deltas[walls[current]] if not visited[current + delta]
+        ]
 
         if not unvisited_neighbors:
             stats["dead_ends"] += 1
-            dead_end_path = current_path + [current_coords]
-            draw_maze_func(
-                grid_cells,
-                cols,
-                len(grid_cells) // cols,
-                explored_cells,
-                dead_end_path,
-                failed=True,
-            )
-            pygame.display.flip()
-            stats["end_time"] = time.time()
-            stats["path_length"] = len(dead_end_path)
-            return (dead_end_path, False)
+            return build_path(parents, current, cols), False
 
         for neighbor in unvisited_neighbors:
-            stack.append((neighbor, current_path + [current_coords]))
+            stack.append((neighbor, current))
+
+    return [], False
+
+
+def bfs_steps(maze, start, goal, explored, stats):
+    """Breadth-first search; finds the shortest path"""
+    cols = maze.cols
+    walls, deltas = maze.walls, maze.deltas
+    start_index, goal_index = maze.index(*start), maze.index(*goal)
+    visited = maze.new_flags()
+    parents = maze.new_indices()
+    visited[start_index] = 1
+    queue = deque([start_index])
+
+    while queue:
+        current = queue.popleft()
+        stats["nodes_visited"] += 1
+        coords = (current % cols, current // cols)
+        explored.add(coords)
+        yield coords
+
+        if current == goal_index:
+            return build_path(parents, current, cols), True
+
+        expanded = False
+        for delta in deltas[walls[current]]:
+            neighbor = current + delta
+            if not visited[neighbor]:
+                visited[neighbor] = 1
+                parents[neighbor] = current
+                queue.append(neighbor)
+                expanded = True
+        if not expanded:
+            stats["dead_ends"] += 1
+
+    return [], False
+
+
+def astar_steps(maze, start, goal, explored, stats, heuristic=True):
+    """A* search with a Manhattan-distance heuristic over a binary heap; finds the
+    cheapest path when the maze has cell costs"""
+    cols = maze.cols
+    walls, deltas, cell_costs = maze.walls, maze.deltas, maze.costs
+    goal_x, goal_y = goal
+    start_index, goal_index = maze.index(*start), maze.index(*goal)
+    closed = maze.new_flags()
+    parents = maze.new_indices()
+    costs = maze.new_indices()
+    costs[start_index] = 0
+    # no decrease-key: a cheaper route pushes a new entry and the stale one is skipped
+    # once its cell is closed. Every cell costs at least 1, so Manhattan distance
+    # never overestimates and the first time the goal is popped its path is cheapest.
+    frontier = [(abs(goal_x - start[0]) + abs(goal_y - start[1]) if heuristic else 0, 0, start_index)]
+
+    while frontier:
+        _, cost, current = heapq.heappop(frontier)
+        if closed[current]:
+            continue
+        closed[current] = 1
+        stats["nodes_visited"] += 1
+        coords = (current % cols, current // cols)
+        explored.add(coords)
+        yield coords
+
+        if current == goal_index:
+            return build_path(parents, current, cols), True
+
+        expanded = False
+        for delta in deltas[walls[current]]:
+            neighbor = current + delta
+            if closed[neighbor]:
+                continue
+            expanded = True
+            new_cost = cost + (cell_costs[neighbor] if cell_costs is not None else 1)
+            if costs[neighbor] == -1 or new_cost < costs[neighbor]:
+                costs[neighbor] = new_cost
+                parents[neighbor] = current
+                estimate = new_cost
+                if heuristic:
+                    x, y = neighbor % cols, neighbor // cols
+                    estimate += abs(goal_x - x) + abs(goal_y - y)
+                heapq.heappush(frontier, (estimate, new_cost, neighbor))
+        if not expanded:
+            stats["dead_ends"] += 1
+
+    return [], False
+
+
+def dijkstra_steps(maze, start, goal, explored, stats):
+    """Dijkstra's algorithm over a binary heap; finds the cheapest path"""
+    return astar_steps(maze, start, goal, explored, stats, heuristic=False)
+
+
+def bidirectional_bfs_steps(maze, start, goal, explored, stats):
+    """Two breadth-first searches from start and goal, expanding the smaller frontier"""
+    cols = maze.cols
+    walls, deltas = maze.walls, maze.deltas
+    start_index, goal_index = maze.index(*start), maze.index(*goal)
+    if start_index == goal_index:
+        explored.add(start)
+        stats["nodes_visited"] = 1
+        return [start], True
+
+    # 1 = reached from start, 2 = reached from goal
+    owner = maze.new_flags()
+    parents = maze.new_indices()
+    owner[start_index], owner[goal_index] = 1, 2
+    frontiers = {1: deque([start_index]), 2: deque([goal_index])}
+
+    while frontiers[1] and frontiers[2]:
+        side = 1 if len(frontiers[1]) <= len(frontiers[2]) else 2
+        queue = frontiers[side]
+        for _ in range(len(queue)):
+            current = queue.popleft()
+            stats["nodes_visited"] += 1
+            coords = (current % cols, current // cols)
+            explored.add(coords)
+            yield coords
+
+            expanded = False
+            for delta in deltas[walls[current]]:
+                neighbor = current + delta
+                if owner[neighbor] == side:
+                    continue
+                if owner[neighbor]:
+                    from_start, from_goal = (current, neighbor) if side == 1 else (neighbor, current)
+                    path = build_path(parents, from_start, cols)
+                    path.extend(reversed(build_path(parents, from_goal, cols)))
+                    return path, True
+                owner[neighbor] = side
+                parents[neighbor] = current
+                queue.append(neighbor)
+                expanded = True
+            if not expanded:
+                stats["dead_ends"] += 1
+
+    return [], False
+
+
+def dead_end_filling_steps(maze, start, goal, explored, stats):
+    """Fill dead ends until only the corridors joining start and goal remain, then walk them"""
+    cols = maze.cols
+    walls, deltas = maze.walls, maze.deltas
+    size = len(walls)
+    start_index, goal_index = maze.index(*start), maze.index(*goal)
+    degree = maze.new_flags()
+    for i in range(size):
+        degree[i] = len(deltas[walls[i]])
+    filled = maze.new_flags()
+    queue = deque(
+        i for i in range(size)
+        if degree[i] <= 1 and i != start_index and i != goal_index
+    )
+
+    while queue:
+        current = queue.popleft()
+        filled[current] = 1
+        stats["nodes_visited"] += 1
+        stats["dead_ends"] += 1
+        coords = (current % cols, current // cols)
+        explored.add(coords)
+        yield coords
+
+        for delta in deltas[walls[current]]:
+            neighbor = current + delta
+            if filled[neighbor]:
+                continue
+            degree[neighbor] -= 1
+            if degree[neighbor] == 1 and neighbor != start_index and neighbor != goal_index:
+                queue.append(neighbor)
+
+    # In a perfect maze only the solution is left; loops in braided mazes are walked breadth-first
+    parents = maze.new_indices()
+    filled[start_index] = 1
+    queue = deque([start_index])
+    while queue:
+        current = queue.popleft()
+        stats["nodes_visited"] += 1
+        if current == goal_index:
+            return build_path(parents, current, cols), True
+        for delta in deltas[walls[current]]:
+            neighbor = current + delta
+            if not filled[neighbor]:
+                filled[neighbor] = 1
+                parents[neighbor] = current
+                queue.append(neighbor)
+
+    return [], False
 
+
+def junction_steps(maze, start, goal, explored, stats, heuristic=True):
+    graph = maze.junction_graph(start, goal)
+    stats["graph_nodes"] = graph.node_count
+    stats["compression"] = graph.compression
+
+    cols = maze.cols
+    goal_x, goal_y = goal
+    cells, offsets, targets, weights = graph.cells, graph.offsets, graph.targets, graph.weights
+    start_node, goal_node = graph.node(maze.index(*start)), graph.node(maze.index(*goal))
+    closed = bytearray(graph.node_count)
+    parents = array("i", [-1]) * graph.node_count
+    parent_edges = array("i", [-1]) * graph.node_count
+    costs = array("i", [-1]) * graph.node_count
+    costs[start_node] = 0
+    frontier = [(abs(goal_x - start[0]) + abs(goal_y - start[1]) if heuristic else 0, 0, start_node)]
+
+    while frontier:
+        _, cost, current = heapq.heappop(frontier)
+        if closed[current]:
+            continue
+        closed[current] = 1
+        stats["nodes_visited"] += 1
+        cell = cells[current]
+        coords = (cell % cols, cell // cols)
+        explored.add(coords)
+        yield coords
+
+        if current == goal_node:
+            nodes, edges = [current], []
+            while parents[nodes[-1]] != -1:
+                edges.append(parent_edges[nodes[-1]])
+                nodes.append(parents[nodes[-1]])
+            nodes.reverse()
+            edges.reverse()
+            return graph.expand(nodes, edges), True
+
+        expanded = False
+        for edge in range(offsets[current], offsets[current + 1]):
+            neighbor = targets[edge]
+            if closed[neighbor]:
+                continue
+            expanded = True
+            new_cost = cost + weights[edge]
+            if costs[neighbor] == -1 or new_cost < costs[neighbor]:
+                costs[neighbor] = new_cost
+                parents[neighbor] = current
+                parent_edges[neighbor] = edge
+                estimate = new_cost
+                if heuristic:
+                    x, y = cells[neighbor] % cols, cells[neighbor] // cols
+                    estimate += abs(goal_x - x) + abs(goal_y - y)
+                heapq.heappush(frontier, (estimate, new_cost, neighbor))
+        if not expanded:
+            stats["dead_ends"] += 1
+
+    return [], False
+
+
+def junction_dijkstra_steps(maze, start, goal, explored, stats):
+    """Dijkstra over the corridor-contracted junction graph (see junctions.py)"""
+    return junction_steps(maze, start, goal, explored, stats, heuristic=False)
+
+
+def junction_astar_steps(maze, start, goal, explored, stats):
+    """A* over the corridor-contracted junction graph with a Manhattan heuristic"""
+    return junction_steps(maze, start, goal, explored, stats, heuristic=True)
+
+
+STEPPERS = {
+    "dfs": dfs_steps,
+    "bfs": bfs_steps,
+    "astar": astar_steps,
+    "dijkstra": dijkstra_steps,
+    "bidirectional": bidirectional_bfs_steps,
+    "dead_end_filling": dead_end_filling_steps,
+    "junction_dijkstra": junction_dijkstra_steps,
+    "junction_astar": junction_astar_steps,
+}
+
+
+def _solver(stepper):
+    """The solve(maze, start, goal, on_step=None, explored=None) function driving a step generator"""
+    def solve(maze, start, goal, on_step=None, explored=None):
+        return _solve(stepper, maze, start, goal, on_step, explored)
+
+    solve.__doc__ = stepper.__doc__
+    solve.stepper = stepper
+    return solve
+
+
+SOLVERS = {name: _solver(stepper) for name, stepper in STEPPERS.items()}
+# the same solvers as module functions, solver.dfs(maze, start, goal) and so on
+dfs = SOLVERS["dfs"]
+bfs = SOLVERS["bfs"]
+astar = SOLVERS["astar"]
+dijkstra = SOLVERS["dijkstra"]
+bidirectional_bfs = SOLVERS["bidirectional"]
+dead_end_filling = SOLVERS["dead_end_filling"]
+junction_dijkstra = SOLVERS["junction_dijkstra"]
+junction_astar = SOLVERS["junction_astar"]
+
+
+def get_solver(name):
+    """Look up a solver in the registry by name; its step generator is `.stepper`"""
+    try:
+        return SOLVERS[name]
+    except KeyError:
+        raise ValueError(
+            f"unknown solver {name!r}, expected one of: {', '.join(SOLVERS)}"
+        ) from None
+
+
+class SolverRun:
+    """A search that can be paused and resumed, advanced a few steps at a time.
+
+    The usual results are available once `done` is set: path, found,
+    explored and stats. stats["solve_time"] only counts time spent inside
+    step(), not the pauses between calls.
+    """
+
+    # how many steps to take between clock checks when a time budget is given
+    CLOCK_EVERY = 64
+
+    def __init__(self, maze, solver="dfs", start=None, goal=None, explored=None):
+        self.explored, self.stats = _begin(explored)
+        self.stats["solve_time"] = 0.0
+        self._steps = get_solver(solver).stepper(
+            maze,
+            start if start is not None else maze.start,
+            goal if goal is not None else maze.goal,
+            self.explored,
+            self.stats,
+        )
+        self.path, self.found, self.done = [], False, False
+
+    def step(self, count=1, budget=None):
+        """Take up to `count` steps (None: until done), stopping early once `budget`
+        seconds have passed; returns the cells explored by these steps"""
+        cells = []
+        if self.done:
+            return cells
+        started = time.perf_counter()
+        deadline = started + budget if budget is not None else None
+        steps = self._steps
+        with instruments.timer("search"):
+            try:
+                while count is None or len(cells) < count:
+                    cells.append(next(steps))
+                    if (
+                        deadline is not None
+                        and len(cells) % self.CLOCK_EVERY == 0
+                        and time.perf_counter() > deadline
+                    ):
+                        break
+            except StopIteration as stop:
+                self.path, self.found = stop.value
+                self.done = True
+                _finish(self.path, self.found, self.explored, self.stats, None)
+        instruments.count("search.steps", len(cells))
+        self.stats["solve_time"] += time.perf_counter() - started
+        return cells
+
+    def run(self):
+        """Run to completion; returns (path, found)"""
+        self.step(None)
+        return (self.path, self.found)
+
+
+def build_path(parents, end, cols):
+    """Follow parent pointers back from `end`; returns the path as (x, y) from the root"""
+    path = []
+    while end != -1:
+        path.append((end % cols, end // cols))
+        end = parents[end]
+    path.reverse()
+    return path
+
+
+def _solve(stepper, maze, start, goal, on_step, explored):
+    """Drive a step generator to the end, reporting every step to on_step"""
+    explored, stats = _begin(explored)
+    steps = stepper(maze, start, goal, explored, stats)
+    # with an observer the time it spends (e.g. drawing) is nested in this timer
+    with instruments.timer("search"):
+        try:
+            if on_step is None:
+                while True:
+                    next(steps)
+            while True:
+                cell = next(steps)
+                if on_step(explored, cell=cell) is False:
+                    return _abort(explored, stats)
+        except StopIteration as stop:
+            path, found = stop.value
+    return _finish(path, found, explored, stats, on_step)
+
+
+def _begin(explored):
+    if explored is None:
+        explored = set()
+    stats = {"start_time": time.time(), "nodes_visited": 0, "dead_ends": 0, "path_length": 0}
+    return explored, stats
+
+
+def _abort(explored, stats):
     stats["end_time"] = time.time()
-    return ([], False)
+    return ([], False, explored, stats)
+
+
+def _finish(path, found, explored, stats, on_step):
+    stats["end_time"] = time.time()
+    stats["path_length"] = len(path)
+    # per-node timing would cost more than the expansions themselves, so they are counted
+    instruments.count("search.expansions", stats["nodes_visited"])
+    instruments.count("search.dead_ends", stats["dead_ends"])
+    if on_step is not None and path:
+        on_step(explored, path, failed=not found)
+    return (path, found, explored, stats)
+
+
+def run_dfs(
+    grid_cells,
+    start,
+    goal,
+    cols,
+    explored_cells,
+    screen,
+    draw_maze_func,
+    clock,
+    stats,
+    SOLVING_SPEED,
+):
+    """Animated DFS kept for compatibility; renders every step through draw_maze_func"""
+    from draw import StepRenderer
 
-# This function is kept for compatibility and will be imported back in the Maze class
-# It's redundant but ensures smooth transition to the new architecture
+    renderer = StepRenderer(
+        screen, draw_maze_func, grid_cells, cols, len(grid_cells) // cols, SOLVING_SPEED
+    )
+    path, found, _, run_stats = get_solver("dfs")(grid_cells.maze, start, goal, renderer, explored_cells)
+    stats.update(run_stats)
+    return (path, found)
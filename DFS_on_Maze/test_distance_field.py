@@ -0,0 +1,72 @@
+from collections import deque
+from random import Random
+
+import numpy as np
+import pytest
+
+import distance_field
+from distance_field import DistanceField
+from maze import Maze
+
+
+def nearest_steps(maze, goals):
+    """Per-goal plain BFS, keeping the fewest steps to any goal (-1 if none)"""
+    best = [-1] * (maze.cols * maze.rows)
+    for goal in goals:
+        steps = {maze.index(*goal): 0}
+        queue = deque([maze.index(*goal)])
+        while queue:
+            cell = queue.popleft()
+            for neighbor in maze.open_neighbors(cell):
+                if neighbor not in steps:
+                    steps[neighbor] = steps[cell] + 1
+                    queue.append(neighbor)
+        for cell, count in steps.items():
+            if best[cell] == -1 or count < best[cell]:
+                best[cell] = count
+    return best
+
+
+def random_cells(maze, rng, count):
+    return [(rng.randrange(maze.cols), rng.randrange(maze.rows)) for _ in range(count)]
+
+
+# 300 goals start with a frontier above VECTOR_FRONTIER, and braided corridors soon
+# narrow it below; 1 and a huge threshold force one expansion path throughout
+@pytest.mark.parametrize("frontier", [distance_field.VECTOR_FRONTIER, 1, 10 ** 9])
+@pytest.mark.parametrize("goal_count", [1, 3, 300])
+def test_distances_match_bfs(monkeypatch, frontier, goal_count):
+    monkeypatch.setattr(distance_field, "VECTOR_FRONTIER", frontier)
+    maze = Maze(60, 60, "prim", 5, braid=0.3)
+    rng = Random(goal_count)
+    goals = random_cells(maze, rng, goal_count)
+    field = DistanceField(maze, goals)
+    assert field.goals == sorted({maze.index(*goal) for goal in goals})
+    assert field.dist.tolist() == nearest_steps(maze, goals)
+    assert field.grid().shape == (maze.rows, maze.cols)
+
+    cells = random_cells(maze, rng, 40) + goals[:3]
+    assert field.distances(cells).tolist() == [field.distance(cell) for cell in cells]
+    for cell, goal in zip(cells, field.nearest_goals(cells)):
+        path = field.path(cell)
+        assert len(path) == field.distance(cell) + 1
+        assert path[0] == cell and path[-1] == goal
+        assert maze.index(*goal) in field.goals
+        for (x, y), (nx, ny) in zip(path, path[1:]):
+            assert maze.index(nx, ny) in maze.open_neighbors(maze.index(x, y))
+
+
+def test_agents_walk_to_their_goals():
+    maze = Maze(40, 30, "kruskal", 2, braid=0.5)
+    goals = random_cells(maze, Random(0), 4)
+    field = DistanceField(maze, goals)
+    positions = field.indices(random_cells(maze, Random(1), 50))
+    targets = field.indices(field.nearest_goals([(int(i) % maze.cols, int(i) // maze.cols) for i in positions]))
+    for _ in range(int(field.dist.max())):
+        positions = field.step(positions)
+    assert np.array_equal(positions, targets)
+
+
+def test_needs_a_goal():
+    with pytest.raises(ValueError):
+        DistanceField(Maze(5, 5, "dfs", 1), [])
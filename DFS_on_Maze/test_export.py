@@ -0,0 +1,115 @@
+import os
+import struct
+from random import Random
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+import pygame
+import pytest
+
+from export import GIF_CODE_SIZE, GIF_PALETTE, export, lzw_encode, render_log
+from maze import Maze
+
+
+def lzw_decode(blocks):
+    """Reference GIF LZW decoder; returns (pixels, clear codes seen, widest code)"""
+    code_size = blocks[0]
+    data = bytearray()
+    position = 1
+    while blocks[position]:
+        data += blocks[position + 1:position + 1 + blocks[position]]
+        position += blocks[position] + 1
+    assert position == len(blocks) - 1, "data after the block terminator"
+
+    clear, end = 1 << code_size, (1 << code_size) + 1
+    bits, total = int.from_bytes(data, "little"), len(data) * 8
+    offset, clears, widest = 0, 0, 0
+    out = bytearray()
+    while True:
+        if offset == 0 or code == clear:
+            table = [bytes([i]) for i in range(clear)] + [b"", b""]
+            width, previous = code_size + 1, None
+        assert offset + width <= total, "stream ends without an end code"
+        code = (bits >> offset) & ((1 << width) - 1)
+        offset += width
+        widest = max(widest, width)
+        if code == clear:
+            clears += 1
+            continue
+        if code == end:
+            return bytes(out), clears, widest
+        if previous is None:
+            entry = table[code]
+        else:
+            assert code <= len(table), f"code {code} not in a table of {len(table)}"
+            entry = table[code] if code < len(table) else previous + previous[:1]
+            if len(table) < 4096:
+                table.append(previous + entry[:1])
+        if len(table) == 1 << width and width < 12:
+            width += 1
+        out += entry
+        previous = entry
+
+
+def read_gif(path):
+    """Every frame of a GIF written by GifWriter, composed as palette indices"""
+    with open(path, "rb") as f:
+        data = f.read()
+    assert data[:6] == b"GIF89a"
+    width, height, packed = struct.unpack("<HHB", data[6:11])
+    colors = 2 << (packed & 7)
+    position = 13 + 3 * colors
+    canvas = np.zeros((height, width), np.uint8)
+    frames = []
+    while data[position] != 0x3B:
+        if data[position] == 0x21:
+            position += 2
+            while data[position]:
+                position += data[position] + 1
+            position += 1
+            continue
+        assert data[position] == 0x2C
+        x, y, w, h, _ = struct.unpack("<HHHHB", data[position + 1:position + 10])
+        start = position = position + 10
+        position += 1
+        while data[position]:
+            position += data[position] + 1
+        position += 1
+        pixels, _, _ = lzw_decode(data[start:position])
+        canvas[y:y + h, x:x + w] = np.frombuffer(pixels, np.uint8).reshape(h, w)
+        frames.append(canvas.copy())
+    return frames
+
+
+@pytest.mark.parametrize("length", [1, 2, 3, 100])
+def test_lzw_short_runs(length):
+    data = bytes([3]) * length
+    assert lzw_decode(lzw_encode(data))[0] == data
+
+
+def test_lzw_widens_codes_and_resets_a_full_table():
+    rng = Random(0)
+    # noise fills the 4096-entry table several times over
+    data = bytes(rng.randrange(1 << GIF_CODE_SIZE) for _ in range(60000))
+    pixels, clears, widest = lzw_decode(lzw_encode(data))
+    assert pixels == data
+    assert widest == 12
+    assert clears > 1
+
+
+def test_gif_frames_match_png_frames(tmp_path):
+    pygame.init()
+    maze = Maze(25, 25, "dfs", 3)
+    log = str(tmp_path / "run.maze")
+    gif = str(tmp_path / "run.gif")
+    written, _ = export(maze, gif, "bfs", events=log, frames=12, workers=1)
+    assert render_log(log, str(tmp_path / "png"), frames=12, workers=1) == written
+
+    palette = np.array(GIF_PALETTE, np.uint8)
+    frames = read_gif(gif)
+    pngs = sorted((tmp_path / "png").iterdir())
+    assert len(frames) == len(pngs) == written
+    for frame, png in zip(frames, pngs):
+        image = pygame.surfarray.array3d(pygame.image.load(str(png))).transpose(1, 0, 2)
+        assert (palette[frame] == image).all(), png.name
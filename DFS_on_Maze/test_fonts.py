@@ -0,0 +1,26 @@
+import os
+import subprocess
+import sys
+
+# a Font used after pygame.quit() crashes the interpreter, so the check runs in a child
+SCRIPT = """
+import pygame
+from fonts import get_font
+for _ in range(3):
+    pygame.init()
+    get_font(24).render("maze", True, (0, 0, 0))
+    pygame.quit()
+pygame.font.init()
+get_font(24)
+pygame.font.quit()
+get_font(24).render("maze", True, (0, 0, 0))
+"""
+
+
+def test_cached_fonts_survive_pygame_restarts():
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", PYGAME_HIDE_SUPPORT_PROMPT="1")
+    result = subprocess.run(
+        [sys.executable, "-c", SCRIPT], cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env, capture_output=True, text=True, timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,56 @@
+from random import Random
+
+import pytest
+
+from generators import GENERATORS, WALL_COUNT, braid, terrain_costs
+from maze import BOTTOM, LEFT, RIGHT, TOP, Maze
+
+
+def assert_symmetric(walls, cols, rows):
+    """Every opening is open from both sides and the outer border stays closed"""
+    for index, mask in enumerate(walls):
+        y, x = divmod(index, cols)
+        if not mask & RIGHT:
+            assert x < cols - 1 and not walls[index + 1] & LEFT
+        if not mask & BOTTOM:
+            assert y < rows - 1 and not walls[index + cols] & TOP
+        if not mask & LEFT:
+            assert x > 0 and not walls[index - 1] & RIGHT
+        if not mask & TOP:
+            assert y > 0 and not walls[index - cols] & BOTTOM
+
+
+@pytest.mark.parametrize("generator", sorted(GENERATORS))
+@pytest.mark.parametrize("cols, rows", [(1, 1), (1, 9), (9, 1), (17, 12)])
+def test_generators_build_perfect_mazes(generator, cols, rows):
+    maze = Maze(cols, rows, generator, 7)
+    assert_symmetric(maze.walls, cols, rows)
+    assert maze.loop_count() == 0
+
+
+@pytest.mark.parametrize("generator", sorted(GENERATORS))
+@pytest.mark.parametrize("fraction", [0.1, 0.5, 1.0])
+def test_braid_keeps_walls_symmetric_and_adds_loops(generator, fraction):
+    maze = Maze(20, 15, generator, 3)
+    dead_ends = sum(WALL_COUNT[mask] == 3 for mask in maze.walls)
+    braid(maze.walls, 20, 15, Random(0), fraction)
+    assert_symmetric(maze.walls, 20, 15)
+    assert maze.loop_count() > 0
+    assert sum(WALL_COUNT[mask] == 3 for mask in maze.walls) < dead_ends
+    if fraction == 1.0:
+        assert all(WALL_COUNT[mask] < 3 for mask in maze.walls)
+
+
+def test_braided_mazes_are_reproducible():
+    first = Maze(20, 20, "dfs", 11, braid=0.5, max_cost=9)
+    second = Maze(20, 20, "dfs", 11, braid=0.5, max_cost=9)
+    assert first.walls == second.walls and first.costs == second.costs
+    assert Maze(20, 20, "dfs", 11).costs is None
+
+
+def test_terrain_costs_stay_in_range():
+    costs = terrain_costs(30, 30, Random(1), 9)
+    assert len(costs) == 900 and set(costs) == set(range(1, 10))
+    for max_cost in (0, 256):
+        with pytest.raises(ValueError):
+            terrain_costs(3, 3, Random(1), max_cost)
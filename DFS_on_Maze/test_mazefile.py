@@ -0,0 +1,104 @@
+from array import array
+from random import Random
+
+import pytest
+
+from maze import Maze
+from mazefile import (
+    MAX_SEED, MappedWalls, MazeCache, load_maze, pack_walls, read_costs, read_events, save_walls, unpack_walls,
+    write_maze,
+)
+
+
+@pytest.mark.parametrize("cells", [1, 2, 7, 8, 1001])
+def test_pack_unpack_round_trip(cells):
+    rng = Random(cells)
+    walls = bytearray(rng.randrange(16) for _ in range(cells))
+    packed = pack_walls(walls)
+    assert len(packed) == (cells + 1) // 2
+    assert unpack_walls(packed, cells) == walls
+
+
+@pytest.mark.parametrize("cols, rows", [(20, 15), (21, 15)])
+def test_write_maze_matches_generated(tmp_path, cols, rows):
+    path = str(tmp_path / "big.maze")
+    seed = write_maze(path, cols, rows, "eller", seed=5)
+    walls = MappedWalls(path)
+    try:
+        assert (walls.cols, walls.rows, walls.seed, walls.generator) == (cols, rows, 5, "eller")
+        assert seed == 5
+        assert walls.unpack() == Maze(cols, rows, "eller", 5).walls
+    finally:
+        walls.close()
+
+
+def test_mapped_walls_stop_at_the_last_cell(tmp_path):
+    # an odd cell count, with a path and costs saved after the walls
+    maze = Maze(21, 15, "dfs", 1, braid=0.1, max_cost=9)
+    maze.correct_path = [(0, 0), (1, 0)]
+    path = str(tmp_path / "maze.maze")
+    maze.save(path)
+    walls = MappedWalls(path)
+    try:
+        assert len(walls) == len(maze.walls)
+        assert list(walls) == list(maze.walls)
+        assert walls[-1] == maze.walls[-1]
+        with pytest.raises(IndexError):
+            walls[len(maze.walls)]
+        with pytest.raises(IndexError):
+            walls[-len(maze.walls) - 1]
+    finally:
+        walls.close()
+    opened = Maze.open(path)
+    try:
+        assert opened.loop_count() == maze.loop_count()
+    finally:
+        opened.close()
+
+
+@pytest.mark.parametrize("include_path", [True, False])
+def test_save_load_round_trip(tmp_path, include_path):
+    maze = Maze(13, 9, "prim", 4, braid=0.5, max_cost=9)
+    maze.correct_path = [(0, 0), (0, 1), (1, 1)]
+    path = str(tmp_path / "maze.maze")
+    maze.save(path, include_path=include_path)
+    for loaded in (Maze.load(path), Maze.open(path)):
+        try:
+            assert (loaded.cols, loaded.rows, loaded.generator, loaded.seed) == (13, 9, "prim", 4)
+            assert list(loaded.walls) == list(maze.walls)
+            assert loaded.costs == maze.costs
+            assert loaded.correct_path == (maze.correct_path if include_path else [])
+        finally:
+            loaded.close()
+
+
+def test_save_events_and_costs_sections(tmp_path):
+    maze = Maze(6, 5, "dfs", 2, max_cost=5)
+    events = array("I", [0, 1, 6, 7])
+    path = str(tmp_path / "run.maze")
+    save_walls(path, maze.walls, 6, 5, 2, "dfs", ([(0, 0), (1, 0)], False), events=events, costs=maze.costs)
+    (cols, rows, seed, generator, flags), walls, solution = load_maze(path)
+    assert (cols, rows, seed, generator) == (6, 5, 2, "dfs")
+    assert walls == maze.walls
+    assert solution == ([(0, 0), (1, 0)], False)
+    with open(path, "rb") as f:
+        assert read_events(f, cols, rows) == events
+        assert read_costs(f, cols, rows, flags) == maze.costs
+
+
+def test_cache_stores_and_reloads(tmp_path):
+    cache = MazeCache(str(tmp_path))
+    first = cache.get(15, 10, "kruskal", MAX_SEED)
+    again = cache.get(15, 10, "kruskal", MAX_SEED)
+    assert again.walls == first.walls == Maze(15, 10, "kruskal", MAX_SEED).walls
+    weighted = cache.get(15, 10, "kruskal", MAX_SEED, braid=0.5, max_cost=3)
+    assert weighted.costs == cache.get(15, 10, "kruskal", MAX_SEED, braid=0.5, max_cost=3).costs
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+@pytest.mark.parametrize("seed", [-1, MAX_SEED + 1])
+def test_unstorable_seed_is_rejected(tmp_path, seed):
+    with pytest.raises(ValueError):
+        MazeCache(str(tmp_path)).get(10, 10, "dfs", seed)
+    with pytest.raises(ValueError):
+        save_walls(str(tmp_path / "bad.maze"), bytearray(4), 2, 2, seed, "dfs")
@@ -0,0 +1,145 @@
+import heapq
+import os
+from collections import deque
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+import pytest
+
+from generators import GENERATORS
+from maze import Maze
+from solver import SOLVERS, SolverRun, dfs, get_solver, run_dfs
+
+# every solver but dfs, which stops at its first dead end
+COMPLETE = [name for name in SOLVERS if name != "dfs"]
+SHAPES = [(1, 1), (1, 9), (9, 1), (12, 8)]
+
+
+def reference_steps(maze, start):
+    """Plain BFS: steps from start to every reachable cell"""
+    steps = {maze.index(*start): 0}
+    queue = deque(steps)
+    while queue:
+        cell = queue.popleft()
+        for neighbor in maze.open_neighbors(cell):
+            if neighbor not in steps:
+                steps[neighbor] = steps[cell] + 1
+                queue.append(neighbor)
+    return steps
+
+
+def reference_costs(maze, start):
+    """Plain Dijkstra: cheapest cost from start to every reachable cell, paying the
+    cost of every cell entered"""
+    costs = maze.costs
+    best = {maze.index(*start): 0}
+    heap = [(0, maze.index(*start))]
+    while heap:
+        cost, cell = heapq.heappop(heap)
+        if cost > best[cell]:
+            continue
+        for neighbor in maze.open_neighbors(cell):
+            total = cost + (costs[neighbor] if costs is not None else 1)
+            if total < best.get(neighbor, total + 1):
+                best[neighbor] = total
+                heapq.heappush(heap, (total, neighbor))
+    return best
+
+
+def assert_valid_path(maze, path, start, goal):
+    assert path[0] == start and path[-1] == goal
+    for (x, y), (next_x, next_y) in zip(path, path[1:]):
+        assert maze.index(next_x, next_y) in maze.open_neighbors(maze.index(x, y))
+
+
+def test_run_dfs_keeps_its_old_signature():
+    pygame.init()
+    try:
+        from draw import Drawing
+
+        maze = Maze(6, 5, "dfs", 0)
+        screen = pygame.display.set_mode((6 * 10, 5 * 10))
+        drawing = Drawing(screen, 10)
+        explored, stats = set(), {}
+        path, found = run_dfs(
+            maze.grid_cells, maze.start, maze.goal, maze.cols, explored, screen, drawing.draw_maze, None, stats, 0,
+        )
+        assert (path, found) == dfs(maze, maze.start, maze.goal)[:2]
+        assert path[0] == maze.start
+        assert explored and stats["nodes_visited"] == len(explored)
+    finally:
+        pygame.quit()
+
+
+def test_module_functions_are_the_registered_solvers():
+    assert dfs is SOLVERS["dfs"]
+
+
+def test_unknown_solver_is_rejected():
+    with pytest.raises(ValueError, match="unknown solver"):
+        get_solver("nope")
+    with pytest.raises(ValueError, match="unknown solver"):
+        SolverRun(Maze(3, 3, seed=0), "nope")
+
+
+@pytest.mark.parametrize("generator", sorted(GENERATORS))
+@pytest.mark.parametrize("cols, rows", SHAPES)
+@pytest.mark.parametrize("solver", COMPLETE)
+def test_solvers_find_the_shortest_path(generator, cols, rows, solver):
+    maze = Maze(cols, rows, generator, 3)
+    path, found, explored, stats = SOLVERS[solver](maze, maze.start, maze.goal)
+    assert found
+    assert_valid_path(maze, path, maze.start, maze.goal)
+    assert len(path) - 1 == reference_steps(maze, maze.start)[maze.index(*maze.goal)]
+    assert stats["path_length"] == len(path)
+
+
+@pytest.mark.parametrize("solver", list(SOLVERS))
+def test_start_equals_goal(solver):
+    maze = Maze(7, 5, "prim", 1)
+    cell = (3, 2)
+    path, found, _, _ = SOLVERS[solver](maze, cell, cell)
+    assert found and path == [cell]
+
+
+@pytest.mark.parametrize("generator", sorted(GENERATORS))
+def test_dfs_walks_open_passages_from_the_start(generator):
+    maze = Maze(10, 10, generator, 5)
+    path, found, explored, _ = dfs(maze, maze.start, maze.goal)
+    assert path[0] == maze.start and set(path) <= explored
+    assert_valid_path(maze, path, maze.start, path[-1])
+    assert found == (path[-1] == maze.goal)
+
+
+@pytest.mark.parametrize("solver", list(SOLVERS))
+def test_solver_run_matches_solving_in_one_go(solver):
+    maze = Maze(15, 15, "kruskal", 2)
+    run = maze.search(solver)
+    while not run.done:
+        run.step(7)
+    path, found, _, _ = SOLVERS[solver](maze, maze.start, maze.goal)
+    assert (run.path, run.found) == (path, found)
+
+
+# solvers that weigh moves by cell costs, and those that count steps only
+CHEAPEST = ["astar", "dijkstra", "junction_dijkstra", "junction_astar"]
+FEWEST_STEPS = ["bfs", "bidirectional", "dead_end_filling"]
+
+
+@pytest.mark.parametrize("generator", sorted(GENERATORS))
+@pytest.mark.parametrize("braid", [0.0, 0.3, 1.0])
+@pytest.mark.parametrize("seed", range(3))
+def test_loops_and_costs(generator, braid, seed):
+    maze = Maze(16, 12, generator, seed, braid=braid, max_cost=9)
+    goal = maze.index(*maze.goal)
+    cheapest = reference_costs(maze, maze.start)[goal]
+    fewest = reference_steps(maze, maze.start)[goal]
+    for solver in CHEAPEST + FEWEST_STEPS:
+        path, found, _, _ = SOLVERS[solver](maze, maze.start, maze.goal)
+        assert found, solver
+        assert_valid_path(maze, path, maze.start, maze.goal)
+        if solver in CHEAPEST:
+            assert maze.path_cost(path) == cheapest, solver
+        else:
+            assert len(path) - 1 == fewest, solver
@@ -0,0 +1,65 @@
+from collections import deque
+from random import Random
+
+import pytest
+
+from generators import GENERATORS
+from maze import Maze
+from tree_index import PathIndex
+
+
+def reference_steps(maze, start):
+    """Plain BFS: steps from start to every reachable cell index"""
+    steps = {maze.index(*start): 0}
+    queue = deque([maze.index(*start)])
+    while queue:
+        cell = queue.popleft()
+        for neighbor in maze.open_neighbors(cell):
+            if neighbor not in steps:
+                steps[neighbor] = steps[cell] + 1
+                queue.append(neighbor)
+    return steps
+
+
+def assert_valid_path(maze, path, start, goal):
+    assert path[0] == start and path[-1] == goal
+    for (x, y), (nx, ny) in zip(path, path[1:]):
+        assert maze.index(nx, ny) in maze.open_neighbors(maze.index(x, y))
+
+
+def random_cells(maze, rng, count):
+    return [(rng.randrange(maze.cols), rng.randrange(maze.rows)) for _ in range(count)]
+
+
+@pytest.mark.parametrize("generator", sorted(GENERATORS))
+@pytest.mark.parametrize("cols, rows", [(1, 1), (1, 17), (17, 1), (23, 16)])
+def test_queries_match_bfs(generator, cols, rows):
+    maze = Maze(cols, rows, generator, 7)
+    rng = Random(generator)
+    roots = [None] + random_cells(maze, rng, 2)
+    for root in roots:
+        index = PathIndex(maze, root)
+        for a in random_cells(maze, rng, 6):
+            steps = reference_steps(maze, a)
+            for b in random_cells(maze, rng, 6) + [a]:
+                distance = index.distance(a, b)
+                assert distance == steps[maze.index(*b)]
+                path = index.path(a, b)
+                assert len(path) == distance + 1
+                assert_valid_path(maze, path, a, b)
+
+
+def test_batch_queries_and_maze_shortcut():
+    maze = Maze(30, 20, "kruskal", 3)
+    index = maze.path_index()
+    pairs = list(zip(random_cells(maze, Random(1), 20), random_cells(maze, Random(2), 20)))
+    assert index.distances(pairs) == [index.distance(a, b) for a, b in pairs]
+    assert index.paths(pairs) == [maze.path(a, b) for a, b in pairs]
+    assert maze.path_index() is index
+
+
+def test_braided_maze_is_rejected():
+    maze = Maze(20, 20, "dfs", 1, braid=0.5)
+    assert maze.loop_count() > 0
+    with pytest.raises(ValueError):
+        PathIndex(maze)
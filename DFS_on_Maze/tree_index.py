@@ -0,0 +1,110 @@
+from array import array
+
+#    ╔══════════════════════════════════════════════════════════════════════╗
+#    ║  Shortest paths between any two cells of a perfect maze, no search.  ║
+#    ║                                                                      ║
+#    ║  A perfect maze is a tree. PathIndex roots it once (depth, parent    ║
+#    ║  and the pre-order Euler tour interval of every cell, so ancestry    ║
+#    ║  is an O(1) check) and adds binary-lifting tables for the lowest     ║
+#    ║  common ancestor. A distance query is then O(log n) and a path       ║
+#    ║  query O(log n + path length). Memory is about 4 bytes per cell per  ║
+#    ║  lifting level, log2 of the tree depth levels in all.                ║
+#    ╚══════════════════════════════════════════════════════════════════════╝
+
+
+class PathIndex:
+    """LCA index over a perfect maze, rooted at `root` (default: the maze start)"""
+
+    def __init__(self, maze, root=None):
+        self.maze = maze
+        cols = maze.cols
+        walls, deltas = maze.walls, maze.deltas
+        size = len(walls)
+        root = maze.index(*(root if root is not None else maze.start))
+
+        parent = array("i", [-1]) * size
+        depth = array("i", [-1]) * size
+        enter = array("i", [0]) * size
+        order = array("i")
+        depth[root] = 0
+        stack = [root]
+        while stack:
+            current = stack.pop()
+            enter[current] = len(order)
+            order.append(current)
+            for delta in deltas[walls[current]]:
+                neighbor = current + delta
+                if neighbor == parent[current]:
+                    continue
+                if depth[neighbor] != -1:
+                    raise ValueError("PathIndex needs a perfect maze, this one has loops")
+                parent[neighbor] = current
+                depth[neighbor] = depth[current] + 1
+                stack.append(neighbor)
+        if len(order) != size:
+            raise ValueError("PathIndex needs a perfect maze, this one is not connected")
+
+        # every subtree is one contiguous run of the pre-order tour
+        subtree = array("i", [1]) * size
+        for cell in reversed(order):
+            if parent[cell] != -1:
+                subtree[parent[cell]] += subtree[cell]
+
+        # up[k][cell] is the 2**k-th ancestor of cell, the root being its own parent
+        up = [array("i", [root if p == -1 else p for p in parent])]
+        max_depth = max(depth)
+        while (1 << len(up)) <= max_depth:
+            previous = up[-1]
+            up.append(array("i", [previous[p] for p in previous]))
+
+        self.cols = cols
+        self.root = root
+        self.parent = parent
+        self.depth = depth
+        self.enter = enter
+        self.subtree = subtree
+        self.up = up
+
+    def is_ancestor(self, a, b):
+        """True if cell index a lies on the path from the root to cell index b"""
+        return self.enter[a] <= self.enter[b] < self.enter[a] + self.subtree[a]
+
+    def lca(self, a, b):
+        """Lowest common ancestor of two cell indices"""
+        if self.is_ancestor(a, b):
+            return a
+        if self.is_ancestor(b, a):
+            return b
+        for level in reversed(self.up):
+            if not self.is_ancestor(level[a], b):
+                a = level[a]
+        return self.up[0][a]
+
+    def distance(self, a, b):
+        """Number of steps between two cells, given as (x, y)"""
+        a, b = self.maze.index(*a), self.maze.index(*b)
+        return self.depth[a] + self.depth[b] - 2 * self.depth[self.lca(a, b)]
+
+    def path(self, a, b):
+        """The path from cell a to cell b as a list of (x, y), both ends included"""
+        cols, parent = self.cols, self.parent
+        a, b = self.maze.index(*a), self.maze.index(*b)
+        meet = self.lca(a, b)
+        head, tail = [], []
+        while a != meet:
+            head.append(a)
+            a = parent[a]
+        while b != meet:
+            tail.append(b)
+            b = parent[b]
+        head.append(meet)
+        head.extend(reversed(tail))
+        return [(i % cols, i // cols) for i in head]
+
+    def distances(self, pairs):
+        """distance() for every (a, b) in pairs"""
+        return [self.distance(a, b) for a, b in pairs]
+
+    def paths(self, pairs):
+        """path() for every (a, b) in pairs"""
+        return [self.path(a, b) for a, b in pairs]